@@ -1,13 +1,23 @@
+import hashlib
+import io
+import threading
 import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
+from block_finder import BlockFinder, standardize_salary_columns
+from fetch_data import build_sample_data
+from name_resolver import NameResolver
+from search_job import SearchJob
 
 # Page config
 st.set_page_config(page_title="DFS Block Finder", layout="wide", page_icon="🏈")
 
+# Blocks kept for the results and analysis tabs (the best, by ceiling)
+MAX_DISPLAY_BLOCKS = 500
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -28,479 +38,110 @@ st.markdown("""
 st.title("🏈 NFL DFS Player Block Finder")
 st.markdown("Find correlated player stacks that match stud pricing with elite upside")
 
-# Initialize session state
-if 'blocks_found' not in st.session_state:
-    st.session_state.blocks_found = False
-if 'analysis_data' not in st.session_state:
-    st.session_state.analysis_data = None
+# Helper functions
+@st.cache_data(show_spinner="Reading uploads...")
+def parse_uploads(upload_key, platform, _salary_bytes, _stats_bytes):
+    """
+    Parse the uploaded salary and stats CSVs (cached per upload_key and platform)
+    
+    Args:
+        upload_key: Content hash of both files (see upload_key)
+        platform: "DraftKings" or "FanDuel"
+        _salary_bytes, _stats_bytes: Raw file contents (not hashed by Streamlit)
+    
+    Returns:
+        (salary_data, stats_data) DataFrames
+    """
+    salary_data = standardize_salary_columns(pd.read_csv(io.BytesIO(_salary_bytes)), platform)
+    stats_data = pd.read_csv(io.BytesIO(_stats_bytes))
+    return salary_data, stats_data
 
-# Sidebar
-with st.sidebar:
-    st.header("⚙️ Configuration")
-    
-    platform = st.radio(
-        "DFS Platform",
-        ["DraftKings", "FanDuel"],
-        horizontal=True,
-        help="Select your DFS platform"
-    )
-    
-    # Platform-specific defaults
-    if platform == "DraftKings":
-        default_price = 10200
-        max_price = 15000
-        salary_cap = 50000
-    else:  # FanDuel
-        default_price = 10000
-        max_price = 12000
-        salary_cap = 60000
-    
-    target_price = st.number_input(
-        "Target Price ($)", 
-        min_value=5000, 
-        max_value=max_price, 
-        value=default_price, 
-        step=100,
-        help="Price of the stud you want to match"
-    )
-    
-    st.caption(f"💰 {platform} Salary Cap: ${salary_cap:,}")
-    
-    price_tolerance = st.number_input(
-        "Price Tolerance ($)", 
-        min_value=0, 
-        max_value=1000, 
-        value=300, 
-        step=50,
-        help="How much flexibility in combined price"
-    )
-    
-    weeks_back = st.slider(
-        "Weeks to Analyze", 
-        3, 17, 6,
-        help="How many recent weeks to include in analysis"
-    )
-    
-    min_ceiling = st.number_input(
-        "Min Ceiling Score", 
-        15.0, 70.0, 35.0, 2.5,
-        help="Minimum peak performance required"
-    )
-    
-    correlation_min = st.slider(
-        "Min Correlation", 
-        0.0, 1.0, 0.65, 0.05,
-        help="How correlated should players be (0-1)"
-    )
-    
-    st.markdown("---")
-    
-    positions = st.multiselect(
-        "Allowed Positions",
-        ["QB", "RB", "WR", "TE"],
-        default=["QB", "WR", "TE"],
-        help="Which positions to include in blocks"
-    )
-    
-    same_team_only = st.checkbox(
-        "Same Team Only", 
-        value=True,
-        help="Only find blocks from same team (more correlation)"
+def upload_key(*files):
+    """SHA-256 of the uploaded files' contents"""
+    digest = hashlib.sha256()
+    for f in files:
+        digest.update(f.getvalue())
+    return digest.hexdigest()
+
+@st.cache_resource(show_spinner="Merging salaries with stats...", max_entries=8)
+def get_block_finder(slate_key, platform, alias_file, _salary_data, _stats_data):
+    """
+    BlockFinder for one slate, shared by every rerun and session, and its lock
+    
+    Keyed by slate_key (upload content hash, or 'sample') and platform, so
+    changing search settings reuses the merged slate and its cached score
+    and correlation matrices. find_blocks also writes to the finder (blocks,
+    last search, run stats, correlation cache), so searches from different
+    sessions take turns holding the lock (see start_search). Resolved
+    player name mismatches are saved to alias_file (if set) for later slates.
+    
+    Returns:
+        (finder, lock)
+    """
+    finder = BlockFinder(
+        _salary_data.copy(), _stats_data.copy(), resolver=NameResolver(alias_file or None)
     )
-    
-    st.markdown("---")
-    st.info("💡 **Tip**: Start with QB+WR combos from high-scoring teams")
+    return finder, threading.Lock()
 
-# Main tabs
-tab1, tab2, tab3, tab4 = st.tabs([
-    "🔍 Find Blocks", 
-    "📊 Block Analysis", 
-    "📈 Game Logs", 
-    "ℹ️ Guide"
-])
+def load_sample_data(platform):
+    """Load sample data for the specified platform (the same slate and stats every run)"""
+    dk_data, fd_data, stats_data = build_sample_data()
+    salary_data = dk_data if platform == "DraftKings" else fd_data
+    return standardize_salary_columns(salary_data, platform), stats_data
 
-with tab1:
-    st.header("Player Block Scanner")
-    
-    col1, col2 = st.columns([3, 1])
-    
-    with col1:
-        st.subheader("Data Upload")
-        
-        upload_method = st.radio(
-            "Choose data source:",
-            ["Upload Files", "Use Sample Data", "Fetch Live Data"],
-            horizontal=True
-        )
-        
-        if upload_method == "Upload Files":
-            st.markdown(f"""
-            **Upload these files for {platform}:**
-            1. {platform} CSV (download from {platform} lobby)
-            2. Weekly fantasy stats CSV
-            
-            **How to export {platform} CSV:**
-            - {"Go to contest lobby → Export Players" if platform == "DraftKings" else "Open any contest → Download Players"}
-            """)
-            
-            salary_file = st.file_uploader(f"{platform} Salaries", type=['csv'])
-            stats_file = st.file_uploader("Weekly Stats", type=['csv'])
-            
-            data_ready = salary_file is not None and stats_file is not None
-            
-        elif upload_method == "Use Sample Data":
-            st.info("Using sample data from Week 10, 2024")
-            data_ready = True
-            # We'll generate sample data
-            
-        else:  # Fetch Live Data
-            st.code("python fetch_data.py --week current", language="bash")
-            if st.button("Run Data Fetcher"):
-                st.warning("⚠️ Run fetch_data.py script first, then refresh")
-            data_ready = False
-    
-    with col2:
-        st.metric("Target Price", f"${target_price:,}")
-        st.metric("Price Range", f"${target_price-price_tolerance:,} - ${target_price+price_tolerance:,}")
-        st.metric("Weeks Analyzed", weeks_back)
-    
-    st.markdown("---")
-    
-    if data_ready:
-        if st.button("🚀 Find Player Blocks", type="primary", use_container_width=True):
-            with st.spinner("🔍 Analyzing thousands of player combinations..."):
-                # Load data based on platform
-                if upload_method == "Upload Files":
-                    salary_data = pd.read_csv(salary_file)
-                    # Standardize column names for both platforms
-                    salary_data = standardize_salary_columns(salary_data, platform)
-                    stats_data = pd.read_csv(stats_file)
-                else:
-                    # Use sample data
-                    salary_data, stats_data = load_sample_data(platform)
-                
-                # Simulate processing
-                import time
-                time.sleep(1)
-                
-                # Generate sample results
-                st.session_state.blocks_found = True
-                st.session_state.analysis_data = generate_sample_blocks(
-                    target_price, 
-                    price_tolerance, 
-                    weeks_back,
-                    platform
-                )
-                st.session_state.platform = platform
-                
-                st.success(f"✅ Found correlated player blocks for {platform}!")
-                st.balloons()
-        
-        if st.session_state.blocks_found:
-            display_block_results(st.session_state.analysis_data, target_price, st.session_state.get('platform', 'DraftKings'))
-    else:
-        st.info("👆 Upload data or select sample data to begin")
+def start_search(finder, lock, **search):
+    """Run finder.find_blocks(**search) on a background thread, holding lock"""
+    def search_finder(**hooks):
+        with lock:
+            return finder.find_blocks(**search, **hooks)
+    return SearchJob(search_finder)
 
-with tab2:
-    st.header("Block Analysis & Comparison")
-    
-    if st.session_state.blocks_found:
-        display_detailed_analysis(st.session_state.analysis_data, target_price)
-    else:
-        st.info("Find blocks first to see detailed analysis")
+@st.fragment(run_every=0.5)
+def search_progress():
+    """
+    Progress, best blocks so far and a Cancel button for the running search
+    
+    Reruns on its own every half second while the rest of the page stays
+    usable; once the search ends it hands the results over and reruns the app.
+    """
+    job = st.session_state.search_job
+    if job is None:
+        return
+    
+    if job.running:
+        progress = job.progress
+        fraction = progress['done'] / progress['total'] if progress['total'] else 0.0
+        st.progress(
+            fraction,
+            text=f"🔍 Checked {progress['done']}/{progress['total']} {progress['unit'] or 'teams'} · "
+                 f"{progress['candidates']:,} combinations · {progress['blocks']:,} blocks "
+                 f"({job.elapsed:.0f}s)"
+        )
+        if st.button("⏹️ Cancel Search"):
+            job.cancel()
+            st.caption("Stopping after the current team/window...")
         
-        # Show what will be available
-        st.markdown("""
-        ### Available Analytics:
-        - **Ceiling/Floor Distributions**: See the range of outcomes
-        - **Correlation Matrices**: How often players score together
-        - **Game-by-Game Breakdown**: Week-by-week performance
-        - **Stud Comparisons**: Side-by-side with expensive options
-        - **Value Ratings**: Points per $1K spent
-        """)
-
-with tab3:
-    st.header("Game Log Explorer")
-    
-    if st.session_state.blocks_found:
-        display_game_logs(st.session_state.analysis_data)
+        partial = job.partial_results()
+        if partial is not None and len(partial):
+            st.caption("Best blocks so far")
+            st.dataframe(partial.to_frame(), use_container_width=True, hide_index=True)
+        return
+    
+    # Finished: hand the results to the rest of the app
+    st.session_state.search_job = None
+    if job.cancelled:
+        st.session_state.search_message = ('warning', f"⏹️ Search cancelled after {job.elapsed:.1f}s")
+    elif job.error is not None:
+        st.session_state.search_message = ('error', f"❌ Search failed: {job.error}")
     else:
-        st.info("Find blocks first to explore game logs")
-
-with tab4:
-    display_guide()
-
-# Helper functions
-def standardize_salary_columns(df, platform):
-    """Standardize column names for both platforms"""
-    if platform == "DraftKings":
-        # DK columns: Name, Position, Salary, TeamAbbrev, AvgPointsPerGame
-        column_map = {
-            'Name': 'Name',
-            'Position': 'Position', 
-            'Salary': 'Salary',
-            'TeamAbbrev': 'Team',
-            'Game Info': 'Opponent'
-        }
-    else:  # FanDuel
-        # FD columns: Nickname, Position, Salary, Team, Opponent, FPPG
-        column_map = {
-            'Nickname': 'Name',
-            'Position': 'Position',
-            'Salary': 'Salary', 
-            'Team': 'Team',
-            'Opponent': 'Opponent'
-        }
-    
-    # Rename columns if they exist
-    for old_col, new_col in column_map.items():
-        if old_col in df.columns:
-            df = df.rename(columns={old_col: new_col})
-    
-    return df
-
-def load_sample_data(platform):
-    """Load sample data for the specified platform"""
-    # Generate sample salaries based on platform
-    if platform == "DraftKings":
-        salary_data = pd.DataFrame({
-            'Name': [
-                'Patrick Mahomes', 'Josh Allen', 'Christian McCaffrey', 'Tyreek Hill',
-                'Travis Kelce', 'Trevor Lawrence', 'Parker Washington',
-                'Justin Fields', 'DJ Moore', 'Caleb Williams', 'Rome Odunze',
-                'Sam Howell', 'Terry McLaurin', 'Bo Nix', 'Courtland Sutton'
-            ],
-            'Position': ['QB', 'QB', 'RB', 'WR', 'TE', 'QB', 'WR', 
-                        'QB', 'WR', 'QB', 'WR', 'QB', 'WR', 'QB', 'WR'],
-            'Salary': [8500, 8300, 10200, 8900, 7200, 6500, 3700,
-                      6300, 4200, 6800, 3400, 5800, 4100, 5400, 4800],
-            'Team': ['KC', 'BUF', 'SF', 'MIA', 'KC', 'JAX', 'JAX',
-                    'CHI', 'CHI', 'CHI', 'CHI', 'WAS', 'WAS', 'DEN', 'DEN'],
-            'Opponent': ['DEN', 'NYJ', 'TB', 'LV', 'DEN', 'MIN', 'MIN',
-                        'GB', 'GB', 'GB', 'GB', 'PHI', 'PHI', 'KC', 'KC']
-        })
-    else:  # FanDuel
-        salary_data = pd.DataFrame({
-            'Name': [
-                'Patrick Mahomes', 'Josh Allen', 'Christian McCaffrey', 'Tyreek Hill',
-                'Travis Kelce', 'Trevor Lawrence', 'Parker Washington',
-                'Justin Fields', 'DJ Moore', 'Caleb Williams', 'Rome Odunze',
-                'Sam Howell', 'Terry McLaurin', 'Bo Nix', 'Courtland Sutton'
-            ],
-            'Position': ['QB', 'QB', 'RB', 'WR', 'TE', 'QB', 'WR',
-                        'QB', 'WR', 'QB', 'WR', 'QB', 'WR', 'QB', 'WR'],
-            'Salary': [9000, 8800, 10000, 8500, 7500, 7200, 4500,
-                      7000, 5000, 7300, 4200, 6500, 5200, 6200, 5500],
-            'Team': ['KC', 'BUF', 'SF', 'MIA', 'KC', 'JAX', 'JAX',
-                    'CHI', 'CHI', 'CHI', 'CHI', 'WAS', 'WAS', 'DEN', 'DEN'],
-            'Opponent': ['DEN', 'NYJ', 'TB', 'LV', 'DEN', 'MIN', 'MIN',
-                        'GB', 'GB', 'GB', 'GB', 'PHI', 'PHI', 'KC', 'KC']
-        })
-    
-    # Sample stats (same for both platforms)
-    stats_data = []
-    for player in salary_data['Name']:
-        team = salary_data[salary_data['Name'] == player]['Team'].values[0]
-        pos = salary_data[salary_data['Name'] == player]['Position'].values[0]
-        
-        if pos == 'QB':
-            base_pts = 22
-            variance = 8
-        elif pos == 'RB':
-            base_pts = 18
-            variance = 10
-        elif pos == 'WR':
-            base_pts = 15
-            variance = 7
-        else:
-            base_pts = 12
-            variance = 6
-        
-        for week in range(5, 11):
-            pts = base_pts + (variance * (hash(player + str(week)) % 100 - 50) / 50)
-            pts = max(5, pts)
-            
-            stats_data.append({
-                'player_name': player,
-                'recent_team': team,
-                'position': pos,
-                'week': week,
-                'season': 2024,
-                'fantasy_points_ppr': round(pts, 1)
-            })
-    
-    return salary_data, pd.DataFrame(stats_data)
-
-def generate_sample_blocks(target_price, tolerance, weeks, platform='DraftKings'):
-    """Generate sample data for demonstration"""
-    
-    if platform == "DraftKings":
-    blocks = [
-        {
-            'name': 'Trevor Lawrence + Parker Washington',
-            'players': ['Trevor Lawrence', 'Parker Washington'],
-            'positions': ['QB', 'WR'],
-            'prices': [6500, 3700],
-            'combined_price': 10200,
-            'team': 'JAX',
-            'game_logs': [46.9, 38.5, 28.0, 38.2, 35.3, 38.4],
-            'correlation': 0.82,
-            'avg_score': 37.5,
-            'ceiling': 46.9,
-            'floor': 28.0,
-            'games_30plus': 5,
-            'opponent': 'MIN'
-        },
-        {
-            'name': 'Justin Fields + DJ Moore',
-            'players': ['Justin Fields', 'DJ Moore'],
-            'positions': ['QB', 'WR'],
-            'prices': [6300, 4200],
-            'combined_price': 10500,
-            'team': 'CHI',
-            'game_logs': [51.7, 44.3, 47.5, 44.2, 30.9, 42.2],
-            'correlation': 0.88,
-            'avg_score': 43.5,
-            'ceiling': 51.7,
-            'floor': 30.9,
-            'games_30plus': 6,
-            'opponent': 'GB'
-        },
-        {
-            'name': 'Caleb Williams + Rome Odunze',
-            'players': ['Caleb Williams', 'Rome Odunze'],
-            'positions': ['QB', 'WR'],
-            'prices': [6800, 3400],
-            'combined_price': 10200,
-            'team': 'CHI',
-            'game_logs': [38.8, 35.3, 29.2, 36.1, 31.8, 40.5],
-            'correlation': 0.75,
-            'avg_score': 35.3,
-            'ceiling': 40.5,
-            'floor': 29.2,
-            'games_30plus': 5,
-            'opponent': 'GB'
-        },
-        {
-            'name': 'Sam Howell + Terry McLaurin',
-            'players': ['Sam Howell', 'Terry McLaurin'],
-            'positions': ['QB', 'WR'],
-            'prices': [5800, 4100],
-            'combined_price': 9900,
-            'team': 'WAS',
-            'game_logs': [42.1, 28.7, 35.8, 31.2, 26.5, 38.9],
-            'correlation': 0.79,
-            'avg_score': 33.9,
-            'ceiling': 42.1,
-            'floor': 26.5,
-            'games_30plus': 4,
-            'opponent': 'PHI'
-        },
-        {
-            'name': 'Bo Nix + Courtland Sutton',
-            'players': ['Bo Nix', 'Courtland Sutton'],
-            'positions': ['QB', 'WR'],
-            'prices': [5400, 4800],
-            'combined_price': 10200,
-            'team': 'DEN',
-            'game_logs': [39.5, 33.2, 41.8, 28.9, 37.4, 35.6],
-            'correlation': 0.71,
-            'avg_score': 36.1,
-            'ceiling': 41.8,
-            'floor': 28.9,
-            'games_30plus': 5,
-            'opponent': 'KC'
-        }
-    ]
-    
-    # Add FanDuel-specific blocks if that platform is selected
-    if platform == "FanDuel":
-        # Adjust prices for FanDuel (typically 15-20% higher than DK)
-        blocks = [
-            {
-                'name': 'Trevor Lawrence + Parker Washington',
-                'players': ['Trevor Lawrence', 'Parker Washington'],
-                'positions': ['QB', 'WR'],
-                'prices': [7200, 4500],
-                'combined_price': 11700,
-                'team': 'JAX',
-                'game_logs': [46.9, 38.5, 28.0, 38.2, 35.3, 38.4],
-                'correlation': 0.82,
-                'avg_score': 37.5,
-                'ceiling': 46.9,
-                'floor': 28.0,
-                'games_30plus': 5,
-                'opponent': 'MIN'
-            },
-            {
-                'name': 'Justin Fields + DJ Moore',
-                'players': ['Justin Fields', 'DJ Moore'],
-                'positions': ['QB', 'WR'],
-                'prices': [7000, 5000],
-                'combined_price': 12000,
-                'team': 'CHI',
-                'game_logs': [51.7, 44.3, 47.5, 44.2, 30.9, 42.2],
-                'correlation': 0.88,
-                'avg_score': 43.5,
-                'ceiling': 51.7,
-                'floor': 30.9,
-                'games_30plus': 6,
-                'opponent': 'GB'
-            },
-            {
-                'name': 'Caleb Williams + Rome Odunze',
-                'players': ['Caleb Williams', 'Rome Odunze'],
-                'positions': ['QB', 'WR'],
-                'prices': [7300, 4200],
-                'combined_price': 11500,
-                'team': 'CHI',
-                'game_logs': [38.8, 35.3, 29.2, 36.1, 31.8, 40.5],
-                'correlation': 0.75,
-                'avg_score': 35.3,
-                'ceiling': 40.5,
-                'floor': 29.2,
-                'games_30plus': 5,
-                'opponent': 'GB'
-            },
-            {
-                'name': 'Sam Howell + Terry McLaurin',
-                'players': ['Sam Howell', 'Terry McLaurin'],
-                'positions': ['QB', 'WR'],
-                'prices': [6500, 5200],
-                'combined_price': 11700,
-                'team': 'WAS',
-                'game_logs': [42.1, 28.7, 35.8, 31.2, 26.5, 38.9],
-                'correlation': 0.79,
-                'avg_score': 33.9,
-                'ceiling': 42.1,
-                'floor': 26.5,
-                'games_30plus': 4,
-                'opponent': 'PHI'
-            },
-            {
-                'name': 'Bo Nix + Courtland Sutton',
-                'players': ['Bo Nix', 'Courtland Sutton'],
-                'positions': ['QB', 'WR'],
-                'prices': [6200, 5500],
-                'combined_price': 11700,
-                'team': 'DEN',
-                'game_logs': [39.5, 33.2, 41.8, 28.9, 37.4, 35.6],
-                'correlation': 0.71,
-                'avg_score': 36.1,
-                'ceiling': 41.8,
-                'floor': 28.9,
-                'games_30plus': 5,
-                'opponent': 'KC'
-            }
-        ]
-    
-    # Filter by price range
-    filtered_blocks = [
-        b for b in blocks 
-        if abs(b['combined_price'] - target_price) <= tolerance
-    ]
-    
-    return filtered_blocks
+        st.session_state.blocks_found = True
+        st.session_state.analysis_data = list(job.result[:MAX_DISPLAY_BLOCKS])
+        st.session_state.search_message = (
+            'success',
+            f"✅ Found {len(job.result):,} player blocks for {st.session_state.platform} "
+            f"in {job.elapsed:.1f}s!"
+        )
+    st.rerun()
 
 def display_block_results(blocks, target_price, platform='DraftKings'):
     """Display the found blocks in a nice format"""
@@ -520,8 +161,8 @@ def display_block_results(blocks, target_price, platform='DraftKings'):
             
             with col1:
                 st.metric("Combined Price", f"${block['combined_price']:,}")
-                st.caption(f"{block['players'][0]}: ${block['prices'][0]:,}")
-                st.caption(f"{block['players'][1]}: ${block['prices'][1]:,}")
+                for player, price in zip(block['players'], block['prices']):
+                    st.caption(f"{player}: ${price:,}")
             
             with col2:
                 st.metric("Avg Score", f"{block['avg_score']:.1f}")
@@ -529,7 +170,7 @@ def display_block_results(blocks, target_price, platform='DraftKings'):
             
             with col3:
                 st.metric("Floor", f"{block['floor']:.1f}")
-                st.metric("30+ Games", f"{block['games_30plus']}/6")
+                st.metric("30+ Games", f"{block['games_30plus']}/{len(block['game_logs'])}")
             
             with col4:
                 st.metric("Correlation", f"{block['correlation']:.2f}")
@@ -549,7 +190,7 @@ def display_block_results(blocks, target_price, platform='DraftKings'):
             fig.add_hline(y=30, line_dash="dash", line_color="orange", 
                          annotation_text="30pt threshold")
             fig.update_layout(
-                title="Last 6 Weeks Combined Scores",
+                title=f"Last {len(block['game_logs'])} Weeks Combined Scores",
                 xaxis_title="Weeks Ago",
                 yaxis_title="Fantasy Points",
                 height=300,
@@ -568,7 +209,7 @@ def display_block_results(blocks, target_price, platform='DraftKings'):
             'Avg': f"{block['avg_score']:.1f}",
             'Ceiling': f"{block['ceiling']:.1f}",
             'Floor': f"{block['floor']:.1f}",
-            '30+ Rate': f"{block['games_30plus']}/6",
+            '30+ Rate': f"{block['games_30plus']}/{len(block['game_logs'])}",
             'Correlation': f"{block['correlation']:.2f}"
         })
     
@@ -627,8 +268,8 @@ def display_game_logs(blocks):
     block = next(b for b in blocks if b['name'] == selected_block)
     
     # Create detailed game log
-    weeks = [f"Week {6-i}" for i in range(6)]
     scores = block['game_logs']
+    weeks = [f"Week {len(scores)-i}" for i in range(len(scores))]
     
     fig = go.Figure()
     fig.add_trace(go.Bar(
@@ -641,7 +282,7 @@ def display_game_logs(blocks):
     fig.add_hline(y=30, line_dash="dash", line_color="red",
                   annotation_text="30pt threshold")
     fig.update_layout(
-        title=f"{selected_block} - Last 6 Weeks",
+        title=f"{selected_block} - Last {len(scores)} Weeks",
         xaxis_title="Week",
         yaxis_title="Combined Fantasy Points",
         height=400
@@ -665,7 +306,7 @@ def display_guide():
     st.markdown("""
     ## What is a Player Block?
     
-    A **player block** is 2-3 correlated players whose combined salary matches an expensive stud, 
+    A **player block** is 2-5 correlated players whose combined salary matches an expensive stud, 
     but with similar or better scoring potential.
     
     ### The Original Example
@@ -814,7 +455,8 @@ def display_guide():
     A: Mix them in 10-30% of your GPP lineups. Diversify!
     
     **Q: What about 3-player blocks?**  
-    A: Coming soon! QB+WR1+WR2 combos for mega-stacks.
+    A: Supported! Set Block Size to 3-5 for QB+WR1+WR2(+TE) mega-stacks, or check
+    Same Game Only for full game stacks with a bring-back.
     
     **Q: Can I use this for cash games?**  
     A: Blocks work better for GPPs. For cash, you want consistent studs.
@@ -826,6 +468,243 @@ def display_guide():
     **Good luck and may your blocks hit their ceiling! 🚀**
     """)
 
+# Initialize session state
+if 'blocks_found' not in st.session_state:
+    st.session_state.blocks_found = False
+if 'analysis_data' not in st.session_state:
+    st.session_state.analysis_data = None
+if 'search_job' not in st.session_state:
+    st.session_state.search_job = None
+
+# Sidebar
+with st.sidebar:
+    st.header("⚙️ Configuration")
+    
+    platform = st.radio(
+        "DFS Platform",
+        ["DraftKings", "FanDuel"],
+        horizontal=True,
+        help="Select your DFS platform"
+    )
+    
+    # Platform-specific defaults
+    if platform == "DraftKings":
+        default_price = 10200
+        max_price = 15000
+        salary_cap = 50000
+    else:  # FanDuel
+        default_price = 10000
+        max_price = 12000
+        salary_cap = 60000
+    
+    target_price = st.number_input(
+        "Target Price ($)", 
+        min_value=5000, 
+        max_value=max_price, 
+        value=default_price, 
+        step=100,
+        help="Price of the stud you want to match"
+    )
+    
+    st.caption(f"💰 {platform} Salary Cap: ${salary_cap:,}")
+    
+    price_tolerance = st.number_input(
+        "Price Tolerance ($)", 
+        min_value=0, 
+        max_value=1000, 
+        value=300, 
+        step=50,
+        help="How much flexibility in combined price"
+    )
+    
+    weeks_back = st.slider(
+        "Weeks to Analyze", 
+        3, 17, 6,
+        help="How many recent weeks to include in analysis"
+    )
+    
+    min_ceiling = st.number_input(
+        "Min Ceiling Score", 
+        15.0, 70.0, 35.0, 2.5,
+        help="Minimum peak performance required"
+    )
+    
+    correlation_min = st.slider(
+        "Min Correlation", 
+        0.0, 1.0, 0.65, 0.05,
+        help="How correlated should players be (0-1)"
+    )
+    
+    st.markdown("---")
+    
+    positions = st.multiselect(
+        "Allowed Positions",
+        ["QB", "RB", "WR", "TE"],
+        default=["QB", "WR", "TE"],
+        help="Which positions to include in blocks"
+    )
+    
+    block_size = st.slider(
+        "Block Size",
+        2, 5, 2,
+        help="Players per block (3-5 for mega-stacks and game stacks)"
+    )
+    
+    same_team_only = st.checkbox(
+        "Same Team Only", 
+        value=True,
+        help="Only find blocks from same team (more correlation)"
+    )
+    
+    same_game_only = st.checkbox(
+        "Same Game Only",
+        value=False,
+        help="Find blocks from both teams of one game (game stacks)"
+    )
+    
+    alias_file = st.text_input(
+        "Name Alias File",
+        value=NameResolver.ALIAS_FILE,
+        help="Where player names matched despite different spellings are saved, "
+             "so later slates match them exactly (blank = don't save)"
+    )
+    
+    st.markdown("---")
+    st.info("💡 **Tip**: Start with QB+WR combos from high-scoring teams")
+
+# Main tabs
+tab1, tab2, tab3, tab4 = st.tabs([
+    "🔍 Find Blocks", 
+    "📊 Block Analysis", 
+    "📈 Game Logs", 
+    "ℹ️ Guide"
+])
+
+with tab1:
+    st.header("Player Block Scanner")
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        st.subheader("Data Upload")
+        
+        upload_method = st.radio(
+            "Choose data source:",
+            ["Upload Files", "Use Sample Data", "Fetch Live Data"],
+            horizontal=True
+        )
+        
+        if upload_method == "Upload Files":
+            st.markdown(f"""
+            **Upload these files for {platform}:**
+            1. {platform} CSV (download from {platform} lobby)
+            2. Weekly fantasy stats CSV
+            
+            **How to export {platform} CSV:**
+            - {"Go to contest lobby → Export Players" if platform == "DraftKings" else "Open any contest → Download Players"}
+            """)
+            
+            salary_file = st.file_uploader(f"{platform} Salaries", type=['csv'])
+            stats_file = st.file_uploader("Weekly Stats", type=['csv'])
+            
+            data_ready = salary_file is not None and stats_file is not None
+            
+        elif upload_method == "Use Sample Data":
+            st.info("Using sample data from Week 10, 2024")
+            data_ready = True
+            # We'll generate sample data
+            
+        else:  # Fetch Live Data
+            st.code("python fetch_data.py --week current", language="bash")
+            if st.button("Run Data Fetcher"):
+                st.warning("⚠️ Run fetch_data.py script first, then refresh")
+            data_ready = False
+    
+    with col2:
+        st.metric("Target Price", f"${target_price:,}")
+        st.metric("Price Range", f"${target_price-price_tolerance:,} - ${target_price+price_tolerance:,}")
+        st.metric("Weeks Analyzed", weeks_back)
+    
+    st.markdown("---")
+    
+    if data_ready:
+        job = st.session_state.search_job
+        if st.button("🚀 Find Player Blocks", type="primary", use_container_width=True,
+                     disabled=job is not None):
+            # Load data based on platform (parsed and merged once per slate)
+            if upload_method == "Upload Files":
+                slate_key = upload_key(salary_file, stats_file)
+                salary_data, stats_data = parse_uploads(
+                    slate_key, platform, salary_file.getvalue(), stats_file.getvalue()
+                )
+            else:
+                # Use sample data
+                slate_key = 'sample'
+                salary_data, stats_data = load_sample_data(platform)
+            finder, finder_lock = get_block_finder(
+                slate_key, platform, alias_file, salary_data, stats_data
+            )
+            
+            # Search on a background thread; search_progress polls it
+            st.session_state.platform = platform
+            st.session_state.search_job = start_search(
+                finder,
+                finder_lock,
+                target_price=target_price,
+                tolerance=price_tolerance,
+                min_weeks=weeks_back,
+                same_team_only=same_team_only,
+                positions=positions,
+                block_size=block_size,
+                same_game_only=same_game_only,
+                min_ceiling=min_ceiling,
+                min_correlation=correlation_min
+            )
+        
+        if st.session_state.search_job is not None:
+            search_progress()
+        
+        message = st.session_state.pop('search_message', None)
+        if message is not None:
+            kind, text = message
+            getattr(st, kind)(text)
+            if kind == 'success':
+                st.balloons()
+        
+        if st.session_state.blocks_found:
+            display_block_results(st.session_state.analysis_data, target_price, st.session_state.get('platform', 'DraftKings'))
+    else:
+        st.info("👆 Upload data or select sample data to begin")
+
+with tab2:
+    st.header("Block Analysis & Comparison")
+    
+    if st.session_state.blocks_found:
+        display_detailed_analysis(st.session_state.analysis_data, target_price)
+    else:
+        st.info("Find blocks first to see detailed analysis")
+        
+        # Show what will be available
+        st.markdown("""
+        ### Available Analytics:
+        - **Ceiling/Floor Distributions**: See the range of outcomes
+        - **Correlation Matrices**: How often players score together
+        - **Game-by-Game Breakdown**: Week-by-week performance
+        - **Stud Comparisons**: Side-by-side with expensive options
+        - **Value Ratings**: Points per $1K spent
+        """)
+
+with tab3:
+    st.header("Game Log Explorer")
+    
+    if st.session_state.blocks_found:
+        display_game_logs(st.session_state.analysis_data)
+    else:
+        st.info("Find blocks first to explore game logs")
+
+with tab4:
+    display_guide()
+
 # Run the app
 if __name__ == "__main__":
     pass
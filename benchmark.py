@@ -0,0 +1,241 @@
+"""
+Block Finder Benchmarks
+Times the BlockFinder engine on synthetic slates and catches regressions
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from block_finder import BlockFinder
+from fetch_data import build_sample_data
+
+# Slate sizes (players, weeks of stats) each suite runs
+SUITES = {
+    'quick': [(50, 6), (200, 17)],
+    'full': [(50, 6), (50, 17), (200, 6), (200, 17), (500, 6), (500, 17), (1000, 6), (1000, 17)],
+}
+
+# Default locations of the result file and the stored baseline
+RESULTS_FILE = os.path.join('benchmarks', 'results.json')
+BASELINE_FILE = os.path.join('benchmarks', 'baseline.json')
+
+# Blocks kept by cross-team searches
+CROSS_TEAM_TOP_K = 1000
+
+def _measure(func: Callable, repeat: int) -> Tuple[float, float, object]:
+    """
+    Best-of-repeat wall time and peak traced memory of func()
+    
+    Timed runs are untraced and, like timeit, run with the garbage collector
+    off; one extra run under tracemalloc gives the peak, so tracing overhead
+    never inflates the times.
+    
+    Returns:
+        (seconds, peak MB, result of the last call)
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                result = func()
+                best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return best, peak / 1024 ** 2, result
+
+def _slate_cases(n_players: int, n_weeks: int, repeat: int, workdir: str) -> List[Dict]:
+    """Benchmark every engine phase on one synthetic slate"""
+    dk_data, _, stats_data = build_sample_data(n_players, seasons=[2024], weeks=range(1, n_weeks + 1))
+    results = []
+    
+    def record(operation: str, func: Callable):
+        seconds, peak_mb, result = _measure(func, repeat)
+        results.append({
+            'case': f"{operation} players={n_players} weeks={n_weeks}",
+            'operation': operation,
+            'players': n_players,
+            'weeks': n_weeks,
+            'seconds': round(seconds, 6),
+            'peak_mb': round(peak_mb, 3),
+        })
+        return result
+    
+    # __init__ includes _merge_data (name resolution, merge, score matrix)
+    finder = record('init', lambda: BlockFinder(dk_data.copy(), stats_data.copy()))
+    
+    # Aim at block_size median salaries, where blocks are plentiful
+    median = np.median(dk_data['Salary'])
+    # Cross-team searches keep only the top CROSS_TEAM_TOP_K blocks
+    # (unbounded triples on 1,000 players are millions of blocks)
+    searches = [
+        ('same_team', True, 2, None),
+        ('same_team', True, 3, None),
+        ('cross_team', False, 2, CROSS_TEAM_TOP_K),
+        ('cross_team', False, 3, CROSS_TEAM_TOP_K),
+    ]
+    for name, same_team_only, block_size, top_k in searches:
+        target = int(median * block_size // 100 * 100)
+        blocks = record(
+            f"find_blocks[{name},{block_size}]",
+            lambda: finder.find_blocks(target, same_team_only=same_team_only,
+                                       block_size=block_size, top_k=top_k)
+        )
+        results[-1]['blocks'] = len(blocks)
+    
+    # Leave a same-team search as finder.blocks for comparison and export
+    with contextlib.redirect_stdout(io.StringIO()):
+        blocks = finder.find_blocks(int(median * 2 // 100 * 100), same_team_only=True, block_size=2)
+    stud = dk_data.loc[dk_data['Position'] == 'QB'].nlargest(1, 'Salary')['Name'].iloc[0]
+    
+    record('compare_to_stud', lambda: [finder.compare_to_stud(block, stud) for block in blocks])
+    results[-1]['blocks'] = len(blocks)
+    record('export_to_csv', lambda: finder.export_to_csv(os.path.join(workdir, 'blocks.csv')))
+    results[-1]['blocks'] = len(blocks)
+    
+    return results
+
+def run_suite(sizes: List[Tuple[int, int]], repeat: int = 3) -> Dict:
+    """
+    Run the benchmarks for every (players, weeks) slate size
+    
+    Returns:
+        Dict with an environment header and one result per case
+    """
+    cases = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_players, n_weeks in sizes:
+            print(f"⏱️  {n_players} players, {n_weeks} weeks...")
+            cases.extend(_slate_cases(n_players, n_weeks, repeat, workdir))
+    
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs",
+        'repeat': repeat,
+        'cases': cases,
+    }
+
+def compare_to_baseline(results: Dict,
+                        baseline: Dict,
+                        max_slowdown: float = 0.5,
+                        min_seconds: float = 0.02) -> List[str]:
+    """
+    Regressions of results against a stored baseline
+    
+    Args:
+        results: Output of run_suite
+        baseline: An earlier run_suite output
+        max_slowdown: Allowed relative increase in time or peak memory
+        min_seconds: Time differences below this are treated as noise
+    
+    Returns:
+        One message per regressed case (empty if none)
+    """
+    previous = {case['case']: case for case in baseline['cases']}
+    regressions = []
+    for case in results['cases']:
+        old = previous.get(case['case'])
+        if old is None:
+            continue
+        if (case['seconds'] > old['seconds'] * (1 + max_slowdown)
+                and case['seconds'] - old['seconds'] > min_seconds):
+            regressions.append(
+                f"{case['case']}: {old['seconds']:.4f}s -> {case['seconds']:.4f}s"
+            )
+        if case['peak_mb'] > old['peak_mb'] * (1 + max_slowdown) and case['peak_mb'] - old['peak_mb'] > 1:
+            regressions.append(
+                f"{case['case']}: {old['peak_mb']:.1f} MB -> {case['peak_mb']:.1f} MB peak"
+            )
+        if old.get('blocks') is not None and case.get('blocks') != old['blocks']:
+            regressions.append(
+                f"{case['case']}: {old['blocks']} blocks -> {case.get('blocks')} blocks"
+            )
+    return regressions
+
+def _print_results(results: Dict, baseline: Optional[Dict]):
+    previous = {case['case']: case for case in baseline['cases']} if baseline else {}
+    print(f"\n{'Case':<50}{'Time (s)':>10}{'Peak MB':>10}{'Blocks':>9}{'vs base':>9}")
+    for case in results['cases']:
+        old = previous.get(case['case'])
+        change = f"{case['seconds'] / old['seconds']:.2f}x" if old and old['seconds'] else ''
+        blocks = case.get('blocks')
+        print(f"{case['case']:<50}{case['seconds']:>10.4f}{case['peak_mb']:>10.1f}"
+              f"{'' if blocks is None else blocks:>9}{change:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the BlockFinder engine on synthetic slates')
+    parser.add_argument('--suite', choices=sorted(SUITES), default='full',
+                       help='Slate sizes to run (quick: 2 small slates, full: 50-1000 players, 6-17 weeks)')
+    parser.add_argument('--repeat', type=int, default=3,
+                       help='Timed runs per case (the best one is kept)')
+    parser.add_argument('--output', default=RESULTS_FILE,
+                       help='Where to write the results JSON')
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                       help='Baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true',
+                       help='Store these results as the new baseline')
+    parser.add_argument('--max-slowdown', type=float, default=0.5,
+                       help='Allowed relative slowdown before a case counts as a regression')
+    
+    args = parser.parse_args()
+    
+    print("\n" + "="*50)
+    print("⏱️  BLOCK FINDER BENCHMARKS")
+    print("="*50 + "\n")
+    
+    results = run_suite(SUITES[args.suite], args.repeat)
+    
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    
+    _print_results(results, baseline)
+    
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Saved results to {path}")
+    
+    if baseline is None:
+        if not args.save_baseline:
+            print(f"\nℹ️  No baseline at {args.baseline} (run with --save-baseline to create one)")
+        return
+    
+    regressions = compare_to_baseline(results, baseline, args.max_slowdown)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regressions against {args.baseline}:")
+        for message in regressions:
+            print(f"   - {message}")
+        sys.exit(1)
+    print(f"\n✅ No regressions against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
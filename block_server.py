@@ -0,0 +1,453 @@
+"""
+Block Server
+Keeps slates loaded in BlockFinder engines and answers block queries over HTTP
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from block_finder import BlockFinder, load_slate
+from name_resolver import NameResolver
+from slate_cache import SlateCache
+
+# find_blocks arguments a query may set (target_price is required)
+SEARCH_PARAMS = (
+    'target_price', 'tolerance', 'min_weeks', 'same_team_only', 'positions',
+    'block_size', 'same_game_only', 'top_k', 'sort_by', 'min_ceiling', 'min_correlation'
+)
+
+# Rows returned per query unless the query sets limit
+DEFAULT_LIMIT = 100
+
+# Latencies kept per endpoint for the /timings percentiles
+TIMING_WINDOW = 1000
+
+class QueryError(Exception):
+    """A query the service can't answer (unknown slate, bad parameters); status is the HTTP code"""
+    
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+class BlockService:
+    """
+    Warm BlockFinder engines plus a response cache, shared by all requests
+    
+    Every slate is loaded and merged once. Queries on one slate run one at
+    a time under that slate's lock, so the cached score and correlation
+    matrices are built once. Queries on different slates run side by side.
+    Responses are cached per (endpoint, slate, parameters) in an LRU of
+    cache_size entries. A repeated query is answered from the cache without
+    touching the engine, and identical queries that arrive together are
+    computed once.
+    """
+    
+    def __init__(self,
+                 cache_size: int = 256,
+                 slate_cache: Optional[SlateCache] = None,
+                 alias_file: Optional[str] = None):
+        """
+        Args:
+            cache_size: Responses kept in the LRU cache (0 disables it)
+            slate_cache: Optional on-disk cache for merged slates and matrices
+            alias_file: JSON file of resolved player name aliases, shared by
+                every slate (default: BlockFinder's, in the slate cache)
+        """
+        self.cache_size = cache_size
+        self.slate_cache = slate_cache
+        self.alias_file = alias_file
+        self.finders: Dict[str, BlockFinder] = {}
+        self.load_seconds: Dict[str, float] = {}
+        self.started = time.time()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._responses = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._timings: Dict[str, Dict] = {}
+        self._timings_lock = threading.Lock()
+    
+    def add_slate(self, name: str, salary_path: str, stats_path: str, platform: str = 'DraftKings'):
+        """Load, merge and index one slate under name"""
+        start = time.perf_counter()
+        salary_data, stats_data = load_slate(salary_path, stats_path, platform)
+        resolver = NameResolver(self.alias_file) if self.alias_file else None
+        finder = BlockFinder(salary_data, stats_data, cache=self.slate_cache, resolver=resolver)
+        
+        self.finders[name] = finder
+        self._locks[name] = threading.Lock()
+        self.load_seconds[name] = time.perf_counter() - start
+        self._clear_cache(name)
+        print(f"✅ Loaded slate '{name}' ({len(finder.dk_data)} players) in {self.load_seconds[name]:.2f}s")
+    
+    def health(self) -> Dict:
+        """Loaded slates and uptime"""
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'slates': {
+                name: {
+                    'players': len(finder.dk_data),
+                    'weeks': len(finder.weeks),
+                    'load_seconds': round(self.load_seconds[name], 3),
+                }
+                for name, finder in self.finders.items()
+            },
+        }
+    
+    def timings(self) -> Dict:
+        """Per-endpoint request counts, cache hit rate and latency percentiles (ms)"""
+        with self._timings_lock:
+            endpoints = {}
+            for endpoint, entry in self._timings.items():
+                latencies = np.array(entry['latencies_ms'])
+                endpoints[endpoint] = {
+                    'requests': entry['requests'],
+                    'errors': entry['errors'],
+                    'cache_hits': entry['cache_hits'],
+                    'p50_ms': round(float(np.percentile(latencies, 50)), 3) if len(latencies) else None,
+                    'p95_ms': round(float(np.percentile(latencies, 95)), 3) if len(latencies) else None,
+                    'max_ms': round(float(latencies.max()), 3) if len(latencies) else None,
+                }
+        with self._cache_lock:
+            cached = len(self._responses)
+        return {'endpoints': endpoints, 'cached_responses': cached, 'cache_size': self.cache_size}
+    
+    def query(self, endpoint: str, params: Dict) -> Tuple[Dict, bool]:
+        """
+        Answer a find_blocks or compare_to_stud query
+        
+        Args:
+            endpoint: 'find_blocks' or 'compare_to_stud'
+            params: JSON query (see find_blocks_response/compare_to_stud_response)
+        
+        Returns:
+            (response dict, whether it came from the cache)
+        """
+        handlers = {
+            'find_blocks': self.find_blocks_response,
+            'compare_to_stud': self.compare_to_stud_response,
+        }
+        if endpoint not in handlers:
+            raise QueryError(f"Unknown endpoint /{endpoint}", 404)
+        if not isinstance(params, dict):
+            raise QueryError("Query must be a JSON object")
+        
+        name = self._slate_name(params)
+        key = json.dumps([endpoint, name, params], sort_keys=True)
+        response = self._cached(key)
+        if response is not None:
+            return response, True
+        
+        with self._locks[name]:
+            # An identical query may have finished while this one waited
+            response = self._cached(key)
+            if response is not None:
+                return response, True
+            response = handlers[endpoint](self.finders[name], params)
+            response['slate'] = name
+        
+        self._store(key, response)
+        return response, False
+    
+    def find_blocks_response(self, finder: BlockFinder, params: Dict) -> Dict:
+        """
+        Blocks for {target_price, ...find_blocks arguments, limit}
+        
+        Returns:
+            {count, blocks}, where blocks holds the first limit blocks
+        """
+        limit = self._limit(params)
+        blocks = finder.find_blocks(**self._search_params(params))
+        return {
+            'count': len(blocks),
+            'blocks': [dict(block) for block in blocks[:limit]],
+        }
+    
+    def compare_to_stud_response(self, finder: BlockFinder, params: Dict) -> Dict:
+        """
+        Blocks priced like a stud, compared to them
+        
+        The query names the stud and may set any find_blocks argument;
+        target_price defaults to the stud's salary.
+        
+        Returns:
+            {count, comparisons}, best ceiling_diff first
+        """
+        stud = params.get('stud')
+        if not isinstance(stud, str):
+            raise QueryError("compare_to_stud needs a stud name")
+        [player_id] = finder.player_ids([stud])
+        if player_id is None:
+            raise QueryError(f"Unknown stud {stud!r}", 404)
+        
+        search = dict(params)
+        stud_price = int(finder.dk_data.loc[finder.dk_data['player_id'] == player_id, 'Salary'].iloc[0])
+        if search.get('target_price') is None:
+            search['target_price'] = stud_price
+        limit = self._limit(params)
+        
+        blocks = finder.find_blocks(**self._search_params(search, extra=('stud',)))
+        if not len(blocks) or not finder.played_mask[player_id].any():
+            return {'count': 0, 'comparisons': []}
+        
+        # Same stud numbers as compare_to_stud: the most recent weeks the stud
+        # played, as many as each block's game log (min_weeks for all of them)
+        played_weeks = np.flatnonzero(finder.played_mask[player_id])[:blocks.game_logs.shape[1]]
+        stud_logs = finder.score_matrix[player_id, played_weeks]
+        stud_ceiling, stud_avg = stud_logs.max(), stud_logs.mean()
+        ceiling_diff = blocks['ceiling'] - stud_ceiling
+        avg_diff = blocks['avg_score'] - stud_avg
+        
+        # Best ceiling_diff first (ties keep search order); only the top
+        # limit rows become dicts
+        top = np.argsort(-ceiling_diff, kind='stable')[:limit]
+        names = blocks.take(top).to_frame()['Block']
+        comparisons = [
+            {
+                'block_name': name,
+                'block_price': blocks['combined_price'][row],
+                'block_ceiling': blocks['ceiling'][row],
+                'block_avg': blocks['avg_score'][row],
+                'stud_name': stud,
+                'stud_price': stud_price,
+                'stud_ceiling': stud_ceiling,
+                'stud_avg': stud_avg,
+                'ceiling_diff': ceiling_diff[row],
+                'avg_diff': avg_diff[row],
+            }
+            for name, row in zip(names, top)
+        ]
+        return {'count': len(blocks), 'comparisons': comparisons}
+    
+    def record(self, endpoint: str, seconds: float, cached: bool = False, error: bool = False):
+        """Add one request to the /timings numbers"""
+        with self._timings_lock:
+            entry = self._timings.setdefault(endpoint, {
+                'requests': 0, 'errors': 0, 'cache_hits': 0,
+                'latencies_ms': deque(maxlen=TIMING_WINDOW),
+            })
+            entry['requests'] += 1
+            entry['errors'] += int(error)
+            entry['cache_hits'] += int(cached)
+            entry['latencies_ms'].append(seconds * 1000)
+    
+    def _slate_name(self, params: Dict) -> str:
+        """The queried slate (may be omitted when only one is loaded)"""
+        name = params.get('slate')
+        if name is None and len(self.finders) == 1:
+            return next(iter(self.finders))
+        if name not in self.finders:
+            raise QueryError(f"Unknown slate {name!r} (loaded: {', '.join(self.finders)})", 404)
+        return name
+    
+    @staticmethod
+    def _limit(params: Dict) -> int:
+        limit = params.get('limit', DEFAULT_LIMIT)
+        if not isinstance(limit, int) or limit < 0:
+            raise QueryError(f"limit must be a non-negative integer, got {limit!r}")
+        return limit
+    
+    @staticmethod
+    def _search_params(params: Dict, extra: Tuple[str, ...] = ()) -> Dict:
+        """find_blocks keyword arguments of a query"""
+        unknown = set(params) - set(SEARCH_PARAMS) - {'slate', 'limit'} - set(extra)
+        if unknown:
+            raise QueryError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+        if 'target_price' not in params:
+            raise QueryError("target_price is required")
+        return {name: params[name] for name in SEARCH_PARAMS if name in params}
+    
+    def _cached(self, key: str) -> Optional[Dict]:
+        with self._cache_lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+            return response
+    
+    def _store(self, key: str, response: Dict):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._responses[key] = response
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.cache_size:
+                self._responses.popitem(last=False)
+    
+    def _clear_cache(self, name: str):
+        """Drop cached responses of a (re)loaded slate"""
+        with self._cache_lock:
+            for key in [key for key in self._responses if json.loads(key)[1] == name]:
+                del self._responses[key]
+
+def _to_json(data: Dict) -> bytes:
+    """JSON-encode a response (NumPy scalars become plain numbers)"""
+    def convert(value):
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        raise TypeError(f"{type(value).__name__} is not JSON serializable")
+    return json.dumps(data, default=convert).encode()
+
+class _Handler(BaseHTTPRequestHandler):
+    """GET /health, /timings; POST /find_blocks, /compare_to_stud with a JSON body"""
+    
+    def do_GET(self):
+        start = time.perf_counter()
+        path = self.path.split('?')[0].strip('/')
+        service = self.server.service
+        if path == 'health':
+            self._send(200, service.health())
+        elif path == 'timings':
+            self._send(200, service.timings())
+        else:
+            self._send(404, {'error': f"Unknown endpoint /{path}"})
+            return
+        service.record(path, time.perf_counter() - start)
+    
+    def do_POST(self):
+        start = time.perf_counter()
+        endpoint = self.path.split('?')[0].strip('/')
+        service = self.server.service
+        cached = False
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            try:
+                params = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError as e:
+                raise QueryError(f"Body is not valid JSON: {e}")
+            response, cached = service.query(endpoint, params)
+            status = 200
+        except QueryError as e:
+            status, response = e.status, {'error': str(e)}
+        except (ValueError, TypeError) as e:
+            # Bad argument values, raised by find_blocks
+            status, response = 400, {'error': str(e)}
+        except Exception as e:
+            status, response = 500, {'error': f"{type(e).__name__}: {e}"}
+        
+        seconds = time.perf_counter() - start
+        if endpoint in ('find_blocks', 'compare_to_stud'):
+            service.record(endpoint, seconds, cached, error=status != 200)
+        self._send(status, dict(response, cached=cached, elapsed_ms=round(seconds * 1000, 3)))
+    
+    def _send(self, status: int, data: Dict):
+        body = _to_json(data)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+def make_server(service: BlockService,
+                host: str = '127.0.0.1',
+                port: int = 8765,
+                verbose: bool = False) -> ThreadingHTTPServer:
+    """HTTP server for service (one thread per connection); call serve_forever() on it"""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+class BlockClient:
+    """
+    Minimal client for a running block server
+    
+    Example:
+        client = BlockClient('http://127.0.0.1:8765')
+        blocks = client.find_blocks(10200, same_team_only=False, top_k=50)['blocks']
+    """
+    
+    def __init__(self, url: str = 'http://127.0.0.1:8765', timeout: float = 300):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+    
+    def health(self) -> Dict:
+        return self._request('health')
+    
+    def timings(self) -> Dict:
+        return self._request('timings')
+    
+    def find_blocks(self, target_price: int, slate: Optional[str] = None, **params) -> Dict:
+        """find_blocks arguments as keywords, plus limit (rows returned)"""
+        return self._request('find_blocks', dict(params, target_price=target_price, slate=slate))
+    
+    def compare_to_stud(self, stud: str, slate: Optional[str] = None, **params) -> Dict:
+        """Stud name, find_blocks arguments as keywords, plus limit"""
+        return self._request('compare_to_stud', dict(params, stud=stud, slate=slate))
+    
+    def _request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
+        data = None
+        if params is not None:
+            data = json.dumps({k: v for k, v in params.items() if v is not None}).encode()
+        request = urllib.request.Request(
+            f"{self.url}/{endpoint}", data=data, headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+def _parse_slate(text: str) -> Tuple[str, str, str, str]:
+    """NAME=SALARIES.csv,STATS.csv[,draftkings|fanduel]"""
+    name, _, paths = text.partition('=')
+    parts = paths.split(',')
+    if not name or len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(
+            f"expected NAME=SALARIES.csv,STATS.csv[,platform], got {text!r}"
+        )
+    platform = parts[2].lower() if len(parts) == 3 else 'draftkings'
+    if platform not in ('draftkings', 'fanduel'):
+        raise argparse.ArgumentTypeError(f"platform must be draftkings or fanduel, got {parts[2]!r}")
+    return name, parts[0], parts[1], 'FanDuel' if platform == 'fanduel' else 'DraftKings'
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Serve block searches for preloaded slates over HTTP')
+    parser.add_argument('--slate', type=_parse_slate, action='append', required=True,
+                       metavar='NAME=SALARIES,STATS[,PLATFORM]',
+                       help='Slate to load (repeat for several), e.g. main=dk.csv,stats.csv')
+    parser.add_argument('--host', default='127.0.0.1',
+                       help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8765,
+                       help='Port to listen on')
+    parser.add_argument('--cache-size', type=int, default=256,
+                       help='Responses kept in the LRU cache (0 disables it)')
+    parser.add_argument('--cache-dir', default=None,
+                       help='SlateCache directory for merged slates and correlation matrices')
+    parser.add_argument('--alias-file', default=None,
+                       help='JSON file of resolved player name aliases (default: name_aliases.json in --cache-dir)')
+    parser.add_argument('--verbose', action='store_true',
+                       help='Log every request')
+    
+    args = parser.parse_args(argv)
+    
+    print("\n" + "="*50)
+    print("🏈 BLOCK SERVER")
+    print("="*50 + "\n")
+    
+    service = BlockService(
+        args.cache_size, SlateCache(args.cache_dir) if args.cache_dir else None, args.alias_file
+    )
+    for name, salary_path, stats_path, platform in args.slate:
+        service.add_slate(name, salary_path, stats_path, platform)
+    
+    server = make_server(service, args.host, args.port, args.verbose)
+    print(f"\n🚀 Serving {len(service.finders)} slates on http://{args.host}:{args.port}")
+    print("   GET /health, /timings  ·  POST /find_blocks, /compare_to_stud (JSON)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
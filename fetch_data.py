@@ -4,11 +4,59 @@ Fetches DraftKings pricing and NFL weekly stats from free sources
 """
 
 import pandas as pd
+import numpy as np
 import json
 import argparse
 from datetime import datetime
 import sys
 
+# Weekly stats columns BlockFinder reads, and the compact dtypes load_nfl_stats uses
+STATS_COLUMNS = ['player_name', 'recent_team', 'position', 'season', 'week', 'fantasy_points_ppr']
+STATS_DTYPES = {
+    'player_name': 'category',
+    'recent_team': 'category',
+    'position': 'category',
+    'season': 'int16',
+    'week': 'int8',
+    'fantasy_points_ppr': 'float32'
+}
+
+# Synthetic slates: teams (nfl_data_py abbreviations) and name pools
+SAMPLE_TEAMS = [
+    'KC', 'DEN', 'BUF', 'NYJ', 'SF', 'TB', 'MIA', 'LV', 'DAL', 'PHI', 'JAX', 'MIN',
+    'CHI', 'GB', 'CIN', 'BAL', 'WAS', 'NYG', 'DET', 'LA', 'HOU', 'IND', 'ATL', 'NO',
+    'SEA', 'ARI', 'PIT', 'CLE', 'LAC', 'TEN', 'CAR', 'NE'
+]
+FIRST_NAMES = [
+    'Aaron', 'Adam', 'Amari', 'Andre', 'Austin', 'Brandon', 'Brian', 'Bryce', 'Caleb', 'Cameron',
+    'Chris', 'Cole', 'Darius', 'David', 'DeAndre', 'Derek', 'Devin', 'Drake', 'Dylan', 'Eric',
+    'Evan', 'Garrett', 'George', 'Isaiah', 'Jack', 'Jalen', 'Jamal', 'James', 'Jaylen', 'Jordan',
+    'Josh', 'Justin', 'Kenny', 'Keenan', 'Kyle', 'Lamar', 'Logan', 'Marcus', 'Mark', 'Malik',
+    'Michael', 'Mike', 'Nick', 'Noah', 'Rashod', 'Rhamondre', 'Ryan', 'Sam', 'Tank', 'Tee',
+    'Terrell', 'Tony', 'Travis', 'Trey', 'Tyler', 'Tyrone', 'Will', 'Xavier', 'Zach', 'Zay'
+]
+LAST_NAMES = [
+    'Adams', 'Allen', 'Anderson', 'Bailey', 'Baker', 'Bell', 'Brooks', 'Brown', 'Carter', 'Chase',
+    'Cook', 'Cooper', 'Davis', 'Diggs', 'Edwards', 'Evans', 'Fields', 'Flowers', 'Ford', 'Gibbs',
+    'Graham', 'Green', 'Hall', 'Harris', 'Henry', 'Hill', 'Hughes', 'Jackson', 'James', 'Jefferson',
+    'Johnson', 'Jones', 'Kelly', 'King', 'Lamb', 'Lewis', 'London', 'Mack', 'Martin', 'Mason',
+    'McCoy', 'Miller', 'Mitchell', 'Moore', 'Morgan', 'Murray', 'Nelson', 'Olave', 'Parker', 'Payne',
+    'Pitts', 'Reed', 'Robinson', 'Rogers', 'Smith', 'Stevens', 'Taylor', 'Thomas', 'Turner', 'Walker',
+    'Ward', 'Washington', 'Watson', 'White', 'Williams', 'Wilson', 'Wright', 'Young'
+]
+
+# Depth chart of a synthetic team, repeated until the slate is full
+SAMPLE_ROSTER = {'QB': 3, 'RB': 5, 'WR': 8, 'TE': 4}
+
+# Salary (worst, best) by position on each platform
+DK_SALARY_RANGE = {'QB': (4800, 8600), 'RB': (4000, 9800), 'WR': (3000, 9600), 'TE': (2500, 8000), 'DST': (2200, 4200)}
+FD_SALARY_RANGE = {'QB': (6200, 9800), 'RB': (4500, 10500), 'WR': (4500, 9800), 'TE': (4000, 8800), 'DST': (3000, 5200)}
+
+# PPR points per game (worst, best) by position, and how much of the team's
+# weekly game script each position with weekly stats shares
+POINTS_RANGE = {'QB': (10.0, 27.0), 'RB': (4.0, 24.0), 'WR': (4.0, 23.0), 'TE': (3.0, 17.0), 'DST': (3.0, 11.0)}
+GAME_SCRIPT_LOADING = {'QB': 1.0, 'RB': 0.4, 'WR': 0.7, 'TE': 0.6}
+
 def fetch_draftkings_data():
     """
     Fetch DraftKings salaries using the unofficial API
@@ -113,125 +161,136 @@ def fetch_nfl_stats(years=[2024], weeks=None):
         print(f"❌ Error fetching NFL stats: {e}")
         return None
 
-def generate_sample_data(platform='both'):
+def load_nfl_stats(seasons, weeks=None, positions=None, csv_path=None):
+    """
+    Load weekly stats for many seasons with a small memory footprint
+    
+    Only STATS_COLUMNS are kept, names/teams/positions are categoricals and
+    points float32. Each season (or CSV chunk) is filtered on season, week
+    range and positions as it is read, so rows the engine will never use
+    are dropped before anything is concatenated or merged.
+    
+    Args:
+        seasons: Seasons to keep, e.g. range(1999, 2025)
+        weeks: Optional (first, last) week range, inclusive
+        positions: Optional positions to keep, e.g. ['QB', 'WR', 'TE']
+        csv_path: Read this stats CSV instead of downloading with nfl_data_py
+    
+    Returns:
+        DataFrame with STATS_COLUMNS, or None if nothing could be loaded
+    """
+    seasons = list(seasons)
+    rss_before = resident_memory_mb()
+    print(f"📥 Loading NFL stats for {len(seasons)} season(s)...")
+    
+    try:
+        if csv_path:
+            string_dtypes = {column: dtype for column, dtype in STATS_DTYPES.items() if dtype == 'category'}
+            chunks = pd.read_csv(csv_path, usecols=STATS_COLUMNS, dtype=string_dtypes, chunksize=250_000)
+        else:
+            import nfl_data_py as nfl
+            chunks = (
+                nfl.import_weekly_data(years=[season], columns=STATS_COLUMNS, downcast=True)
+                for season in seasons
+            )
+        
+        parts = [_filter_stats(chunk, seasons, weeks, positions) for chunk in chunks]
+        
+    except ImportError:
+        print("❌ nfl-data-py package not installed")
+        print("   Run: pip install nfl-data-py")
+        return None
+    except Exception as e:
+        print(f"❌ Error loading NFL stats: {e}")
+        return None
+    
+    stats = _concat_stats(parts)
+    
+    rss_after = resident_memory_mb()
+    print(f"✅ Loaded {len(stats):,} player-week records "
+          f"({stats.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB)")
+    print(f"   Resident memory: {rss_before:.0f} MB -> {rss_after:.0f} MB")
+    
+    return stats
+
+def _filter_stats(chunk, seasons, weeks, positions):
+    """Keep the rows and columns the engine needs, in compact dtypes"""
+    keep = chunk['season'].isin(seasons)
+    if weeks:
+        keep &= chunk['week'].between(*weeks)
+    if positions:
+        keep &= chunk['position'].isin(positions)
+    
+    return chunk.loc[keep, STATS_COLUMNS].astype(STATS_DTYPES)
+
+def _concat_stats(parts):
+    """Concatenate filtered chunks, merging categories instead of falling back to object"""
+    if not parts:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in STATS_DTYPES.items()})
+    
+    categorical = [column for column, dtype in STATS_DTYPES.items() if dtype == 'category']
+    stats = pd.concat([part.drop(columns=categorical) for part in parts], ignore_index=True)
+    for column in categorical:
+        values = pd.api.types.union_categoricals([part[column] for part in parts], ignore_order=True)
+        stats[column] = values.remove_unused_categories()
+    
+    return stats[STATS_COLUMNS]
+
+def resident_memory_mb():
+    """Resident memory of this process in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def parse_seasons(text):
+    """'2024' -> [2024], '2019-2024' -> [2019, ..., 2024]"""
+    first, _, last = text.partition('-')
+    return list(range(int(first), int(last or first) + 1))
+
+def generate_sample_data(platform='both', n_players=None, n_teams=None, seasons=None, seed=0):
     """
     Generate sample data for testing
+    
+    Without n_players the slate is the 16 hand-picked players below with
+    weeks 5-10 of 2024; with n_players a synthetic slate of that size is
+    generated (see build_sample_data). The same seed always gives the same
+    files.
+    
+    Args:
+        platform: 'draftkings', 'fanduel' or 'both'
+        n_players: Size of a synthetic slate (None = the 16 sample players)
+        n_teams: Teams on a synthetic slate (default: about 30 players per team)
+        seasons: Seasons of weekly stats (default: weeks 5-10 of 2024)
+        seed: Random seed for salaries and points
     """
     print("📝 Generating sample data...")
     
+    dk_data, fd_data, stats_df = build_sample_data(n_players, n_teams, seasons, seed)
+    
     # Generate for DraftKings
     if platform in ['draftkings', 'both']:
-        dk_data = pd.DataFrame({
-            'Name': [
-                'Patrick Mahomes', 'Josh Allen', 'Christian McCaffrey', 'Tyreek Hill',
-                'Travis Kelce', 'CeeDee Lamb', 'Trevor Lawrence', 'Parker Washington',
-                'Justin Fields', 'DJ Moore', 'Caleb Williams', 'Rome Odunze',
-                'Joe Burrow', 'Ja\'Marr Chase', 'Sam Howell', 'Terry McLaurin'
-            ],
-            'Position': [
-                'QB', 'QB', 'RB', 'WR', 'TE', 'WR', 'QB', 'WR', 
-                'QB', 'WR', 'QB', 'WR', 'QB', 'WR', 'QB', 'WR'
-            ],
-            'Salary': [
-                8500, 8300, 10200, 8900, 7200, 8700, 6500, 3700,
-                6300, 4200, 6800, 3400, 7900, 8500, 5800, 4100
-            ],
-            'Team': [
-                'KC', 'BUF', 'SF', 'MIA', 'KC', 'DAL', 'JAX', 'JAX',
-                'CHI', 'CHI', 'CHI', 'CHI', 'CIN', 'CIN', 'WAS', 'WAS'
-            ],
-            'Opponent': [
-                'DEN', 'NYJ', 'TB', 'LV', 'DEN', 'PHI', 'MIN', 'MIN',
-                'GB', 'GB', 'GB', 'GB', 'BAL', 'BAL', 'PHI', 'PHI'
-            ]
-        })
-        
         dk_file = f"draftkings_salaries_sample.csv"
         dk_data.to_csv(dk_file, index=False)
-        print(f"✅ Created {dk_file}")
+        print(f"✅ Created {dk_file} ({len(dk_data)} players)")
     
     # Generate for FanDuel
     if platform in ['fanduel', 'both']:
-        fd_data = pd.DataFrame({
-            'Nickname': [  # FanDuel uses 'Nickname' instead of 'Name'
-                'Patrick Mahomes', 'Josh Allen', 'Christian McCaffrey', 'Tyreek Hill',
-                'Travis Kelce', 'CeeDee Lamb', 'Trevor Lawrence', 'Parker Washington',
-                'Justin Fields', 'DJ Moore', 'Caleb Williams', 'Rome Odunze',
-                'Joe Burrow', 'Ja\'Marr Chase', 'Sam Howell', 'Terry McLaurin'
-            ],
-            'Position': [
-                'QB', 'QB', 'RB', 'WR', 'TE', 'WR', 'QB', 'WR',
-                'QB', 'WR', 'QB', 'WR', 'QB', 'WR', 'QB', 'WR'
-            ],
-            'Salary': [  # FanDuel prices are typically higher
-                9000, 8800, 10000, 8500, 7500, 8300, 7200, 4500,
-                7000, 5000, 7300, 4200, 8400, 8100, 6500, 5200
-            ],
-            'Team': [
-                'KC', 'BUF', 'SF', 'MIA', 'KC', 'DAL', 'JAX', 'JAX',
-                'CHI', 'CHI', 'CHI', 'CHI', 'CIN', 'CIN', 'WAS', 'WAS'
-            ],
-            'Opponent': [
-                'DEN', 'NYJ', 'TB', 'LV', 'DEN', 'PHI', 'MIN', 'MIN',
-                'GB', 'GB', 'GB', 'GB', 'BAL', 'BAL', 'PHI', 'PHI'
-            ],
-            'FPPG': [  # FanDuel includes average fantasy points
-                23.5, 24.1, 22.8, 19.3, 14.2, 18.7, 19.8, 8.5,
-                18.3, 13.2, 17.9, 9.1, 21.2, 20.4, 16.8, 14.1
-            ]
-        })
-        
         fd_file = f"fanduel_salaries_sample.csv"
         fd_data.to_csv(fd_file, index=False)
-        print(f"✅ Created {fd_file}")
-    
-    # Sample weekly stats (last 6 weeks) - same for both platforms
-    # Use whichever dataset we generated
-    if platform in ['draftkings', 'both']:
-        player_source = dk_data
-    else:
-        player_source = fd_data
-        # Convert Nickname to Name for consistency
-        player_source = player_source.rename(columns={'Nickname': 'Name'})
-    
-    stats_data = []
-    for player in player_source['Name']:
-        team = player_source[player_source['Name'] == player]['Team'].values[0]
-        pos = player_source[player_source['Name'] == player]['Position'].values[0]
-        
-        # Generate realistic fantasy points
-        if pos == 'QB':
-            base_pts = 22
-            variance = 8
-        elif pos == 'RB':
-            base_pts = 18
-            variance = 10
-        elif pos == 'WR':
-            base_pts = 15
-            variance = 7
-        else:  # TE
-            base_pts = 12
-            variance = 6
-        
-        for week in range(5, 11):
-            pts = base_pts + (variance * (hash(player + str(week)) % 100 - 50) / 50)
-            pts = max(5, pts)  # Floor of 5 points
-            
-            stats_data.append({
-                'player_name': player,
-                'recent_team': team,
-                'position': pos,
-                'week': week,
-                'season': 2024,
-                'fantasy_points_ppr': round(pts, 1)
-            })
-    
-    stats_df = pd.DataFrame(stats_data)
+        print(f"✅ Created {fd_file} ({len(fd_data)} players)")
     
-    # Save stats file
+    # Save stats file (same for both platforms)
     stats_file = f"nfl_weekly_stats_sample.csv"
     stats_df.to_csv(stats_file, index=False)
-    print(f"✅ Created {stats_file}")
+    print(f"✅ Created {stats_file} ({len(stats_df):,} player-week records)")
     
     # Return the data
     if platform == 'draftkings':
@@ -241,6 +300,213 @@ def generate_sample_data(platform='both'):
     else:  # both
         return (dk_data, fd_data), stats_df
 
+def build_sample_data(n_players=None, n_teams=None, seasons=None, seed=0, weeks=None):
+    """
+    Build sample salary files and weekly stats in memory
+    
+    Args:
+        n_players: Skill players on a synthetic slate, plus one DST per
+            team (None = the 16 hand-picked sample players)
+        n_teams: Teams on a synthetic slate, at most 32 (default: about 30
+            players per team)
+        seasons: Seasons of weekly stats, e.g. [2022, 2023, 2024]
+            (default: 2024, weeks 5-10)
+        seed: Random seed for salaries and points
+        weeks: Weeks of each season to generate (default: the full regular
+            season when seasons are given)
+    
+    Returns:
+        (dk_data, fd_data, stats_df)
+    """
+    rng = np.random.default_rng(seed)
+    
+    if n_players is None:
+        dk_data, fd_data = _sample_slate()
+        talent = None
+    else:
+        dk_data, fd_data, talent = _synthetic_slate(n_players, n_teams, rng)
+    
+    if seasons is None:
+        seasons, weeks = [2024], weeks or range(5, 11)
+    stats_df = _synthetic_stats(dk_data, list(seasons), weeks, rng, talent)
+    
+    return dk_data, fd_data, stats_df
+
+def _sample_slate():
+    """The 16 hand-picked sample players as (DraftKings, FanDuel) salary files"""
+    names = [
+        'Patrick Mahomes', 'Josh Allen', 'Christian McCaffrey', 'Tyreek Hill',
+        'Travis Kelce', 'CeeDee Lamb', 'Trevor Lawrence', 'Parker Washington',
+        'Justin Fields', 'DJ Moore', 'Caleb Williams', 'Rome Odunze',
+        'Joe Burrow', 'Ja\'Marr Chase', 'Sam Howell', 'Terry McLaurin'
+    ]
+    positions = [
+        'QB', 'QB', 'RB', 'WR', 'TE', 'WR', 'QB', 'WR',
+        'QB', 'WR', 'QB', 'WR', 'QB', 'WR', 'QB', 'WR'
+    ]
+    teams = [
+        'KC', 'BUF', 'SF', 'MIA', 'KC', 'DAL', 'JAX', 'JAX',
+        'CHI', 'CHI', 'CHI', 'CHI', 'CIN', 'CIN', 'WAS', 'WAS'
+    ]
+    opponents = [
+        'DEN', 'NYJ', 'TB', 'LV', 'DEN', 'PHI', 'MIN', 'MIN',
+        'GB', 'GB', 'GB', 'GB', 'BAL', 'BAL', 'PHI', 'PHI'
+    ]
+    
+    dk_data = pd.DataFrame({
+        'Name': names,
+        'Position': positions,
+        'Salary': [
+            8500, 8300, 10200, 8900, 7200, 8700, 6500, 3700,
+            6300, 4200, 6800, 3400, 7900, 8500, 5800, 4100
+        ],
+        'Team': teams,
+        'Opponent': opponents
+    })
+    
+    fd_data = pd.DataFrame({
+        'Nickname': names,  # FanDuel uses 'Nickname' instead of 'Name'
+        'Position': positions,
+        'Salary': [  # FanDuel prices are typically higher
+            9000, 8800, 10000, 8500, 7500, 8300, 7200, 4500,
+            7000, 5000, 7300, 4200, 8400, 8100, 6500, 5200
+        ],
+        'Team': teams,
+        'Opponent': opponents,
+        'FPPG': [  # FanDuel includes average fantasy points
+            23.5, 24.1, 22.8, 19.3, 14.2, 18.7, 19.8, 8.5,
+            18.3, 13.2, 17.9, 9.1, 21.2, 20.4, 16.8, 14.1
+        ]
+    })
+    
+    return dk_data, fd_data
+
+def _synthetic_slate(n_players, n_teams, rng):
+    """
+    Random salary files for n_players skill players
+    
+    Each team gets a depth chart in SAMPLE_ROSTER proportions plus a DST,
+    and plays the next team in the list. Salaries follow a hidden talent
+    score with some noise, so price predicts points about as loosely as on
+    a real slate.
+    
+    Returns:
+        (dk_data, fd_data, talent), talent being each row's 0-1 score
+    """
+    if n_teams is None:
+        n_teams = min(len(SAMPLE_TEAMS), max(2, 2 * round(n_players / 60)))
+    if not 2 <= n_teams <= len(SAMPLE_TEAMS):
+        raise ValueError(f"n_teams must be between 2 and {len(SAMPLE_TEAMS)}, got {n_teams}")
+    teams = np.array(SAMPLE_TEAMS[:n_teams])
+    opponents = np.array([teams[i ^ 1] if (i ^ 1) < n_teams else teams[0] for i in range(n_teams)])
+    
+    # Player i is the (i // n_teams)-th player on team i % n_teams
+    depth_chart = np.repeat(list(SAMPLE_ROSTER), list(SAMPLE_ROSTER.values()))
+    team_ids = np.concatenate([np.arange(n_players) % n_teams, np.arange(n_teams)])
+    positions = np.concatenate([
+        depth_chart[(np.arange(n_players) // n_teams) % len(depth_chart)],
+        np.full(n_teams, 'DST')
+    ])
+    
+    # Unique names: first x last name pairs, then suffixes once those run out
+    pairs = rng.permutation(len(FIRST_NAMES) * len(LAST_NAMES))[np.arange(n_players) % (len(FIRST_NAMES) * len(LAST_NAMES))]
+    names = pd.Series(np.char.add(np.char.add(np.array(FIRST_NAMES)[pairs // len(LAST_NAMES)], ' '),
+                                  np.array(LAST_NAMES)[pairs % len(LAST_NAMES)]))
+    repeat = names.groupby(names).cumcount().to_numpy()
+    names = names + np.array(['', ' II', ' III', ' IV', ' V'])[np.minimum(repeat, 4)]
+    names = np.concatenate([names.to_numpy(dtype=str), np.char.add(teams, ' DST')])
+    
+    # Talent 0-1, skewed so stars are scarce
+    talent = rng.beta(1.5, 3.0, size=len(positions))
+    price = np.clip(talent + rng.normal(0.0, 0.08, size=len(positions)), 0.0, 1.0)
+    
+    salaries = {}
+    for platform, ranges in (('dk', DK_SALARY_RANGE), ('fd', FD_SALARY_RANGE)):
+        low, high = np.array([ranges[position] for position in positions]).T
+        salaries[platform] = (np.round((low + (high - low) * price) / 100) * 100).astype(int)
+    
+    dk_data = pd.DataFrame({
+        'Name': names,
+        'Position': positions,
+        'Salary': salaries['dk'],
+        'Team': teams[team_ids],
+        'Opponent': opponents[team_ids]
+    })
+    
+    fd_data = pd.DataFrame({
+        'Nickname': names,
+        'Position': np.where(positions == 'DST', 'D', positions),
+        'Salary': salaries['fd'],
+        'Team': teams[team_ids],
+        'Opponent': opponents[team_ids],
+        'FPPG': np.round(_points_mean(positions, talent), 1)
+    })
+    
+    return dk_data, fd_data, talent
+
+def _points_mean(positions, talent):
+    """Expected PPR points per game for a talent score in 0-1"""
+    low, high = np.array([POINTS_RANGE[position] for position in positions]).T
+    return low + (high - low) * talent
+
+def _synthetic_stats(dk_data, seasons, weeks, rng, talent=None):
+    """
+    Weekly PPR stats for the slate's skill players
+    
+    Points are a player's mean (from talent, or from salary when no talent
+    is given) plus a per-season drift, a per-week team game script
+    shared by teammates (weighted by GAME_SCRIPT_LOADING, so stacks
+    correlate) and individual noise. Each team has one bye per season,
+    about 8% of games are missed, and some players only start in a later
+    season, as rookies do.
+    """
+    skill = dk_data['Position'].isin(list(GAME_SCRIPT_LOADING)).to_numpy()
+    players = dk_data[skill].reset_index(drop=True)
+    positions = players['Position'].to_numpy()
+    if talent is not None:
+        talent = np.asarray(talent)[skill]
+    else:
+        low, high = np.array([DK_SALARY_RANGE[position] for position in positions]).T
+        talent = np.clip((players['Salary'].to_numpy() - low) / (high - low), 0.0, 1.0)
+    team_ids, teams = pd.factorize(players['Team'])
+    
+    # One column per (season, week)
+    season_weeks = [
+        (season, week)
+        for season in seasons
+        for week in (weeks or range(1, 19 if season >= 2021 else 18))
+    ]
+    column_season = np.searchsorted(seasons, [season for season, _ in season_weeks])
+    column_week = np.array([week for _, week in season_weeks])
+    n_players, n_columns = len(players), len(season_weeks)
+    
+    mean = _points_mean(positions, talent)
+    drift = rng.normal(0.0, 2.0, size=(n_players, len(seasons)))
+    game_script = rng.normal(0.0, 5.0, size=(len(teams), n_columns))
+    loading = np.array([GAME_SCRIPT_LOADING[position] for position in positions])
+    noise = rng.normal(0.0, 1.0, size=(n_players, n_columns)) * (2.0 + 0.25 * mean)[:, None]
+    points = (mean[:, None] + drift[:, column_season]
+              + loading[:, None] * game_script[team_ids] + noise)
+    
+    # Missed games: byes (weeks 5-14), injuries, seasons before a player's first
+    bye = rng.integers(5, 15, size=(len(teams), len(seasons)))
+    first_season = np.where(rng.random(n_players) < 0.3, rng.integers(0, len(seasons), size=n_players), 0)
+    played = (
+        (bye[team_ids][:, column_season] != column_week)
+        & (rng.random((n_players, n_columns)) > 0.08)
+        & (column_season[None, :] >= first_season[:, None])
+    )
+    rows, columns = np.nonzero(played)
+    
+    return pd.DataFrame({
+        'player_name': players['Name'].to_numpy()[rows],
+        'recent_team': players['Team'].to_numpy()[rows],
+        'position': positions[rows],
+        'season': np.array(seasons)[column_season[columns]],
+        'week': column_week[columns],
+        'fantasy_points_ppr': np.round(np.clip(points[rows, columns], -2.0, None), 2)
+    })
+
 def main():
     parser = argparse.ArgumentParser(description='Fetch DFS data from free sources')
     parser.add_argument('--platform', type=str, default='draftkings',
@@ -254,6 +520,15 @@ def main():
                        help='Only fetch DraftKings data')
     parser.add_argument('--stats-only', action='store_true',
                        help='Only fetch NFL stats')
+    parser.add_argument('--seasons', type=str, default=None,
+                       help='Load compact stats for a season range instead (e.g. 1999-2024); '
+                            'with --sample, the seasons to generate (a range, or a count ending in 2024)')
+    parser.add_argument('--players', type=int, default=None,
+                       help='With --sample, generate a synthetic slate of this many players')
+    parser.add_argument('--teams', type=int, default=None,
+                       help='With --sample --players, number of teams (2-32)')
+    parser.add_argument('--seed', type=int, default=0,
+                       help='With --sample, random seed (the same seed gives the same files)')
     
     args = parser.parse_args()
     
@@ -262,7 +537,13 @@ def main():
     print("="*50 + "\n")
     
     if args.sample:
-        generate_sample_data(args.platform if not args.dk_only else 'draftkings')
+        seasons = parse_seasons(args.seasons) if args.seasons else None
+        if seasons and len(seasons) == 1 and seasons[0] < 1900:
+            # A count: that many seasons ending in 2024
+            seasons = list(range(2025 - seasons[0], 2025))
+        generate_sample_data(args.platform if not args.dk_only else 'draftkings',
+                             n_players=args.players, n_teams=args.teams,
+                             seasons=seasons, seed=args.seed)
         print("\n✅ Sample data generated!")
         print("\n📁 Files created:")
         if args.platform in ['draftkings', 'both'] or args.dk_only:
@@ -281,7 +562,14 @@ def main():
             return
     
     if not args.dk_only:
-        stats_df = fetch_nfl_stats(years=[2024])
+        if args.seasons:
+            stats_df = load_nfl_stats(parse_seasons(args.seasons))
+            if stats_df is not None:
+                filename = f"nfl_weekly_stats_{args.seasons}.csv"
+                stats_df.to_csv(filename, index=False)
+                print(f"✅ Saved NFL stats to {filename}")
+        else:
+            stats_df = fetch_nfl_stats(years=[2024])
         if stats_df is None:
             print("\n⚠️  Using sample data instead...")
             generate_sample_data()
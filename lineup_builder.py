@@ -0,0 +1,420 @@
+"""
+Lineup Builder
+Fills full DFS lineups around found blocks under the salary cap
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from block_finder import BlockFinder, BlockTable
+
+class LineupBuilder:
+    """
+    Exact lineup optimizer anchored on blocks from find_blocks
+    
+    Every lineup contains one block; the remaining roster slots are filled
+    with the players that maximize total projection under the salary cap,
+    the positional requirements (including FLEX), exposure limits and a
+    minimum number of unique players versus every earlier lineup.
+    
+    The solver is a depth-first branch-and-bound. Its bounds come from
+    per-position knapsack tables (best projection for j more players of a
+    position within a salary budget) combined across positions, so they
+    are exact when no exposure/uniqueness constraint binds and the search
+    usually walks straight to the optimum. The tables are kept between
+    lineups: excluding a player only recomputes the rows of its position's
+    table that include them, and the best runner-up lineups of one solve
+    seed the incumbent of the next (warm start).
+    """
+    
+    # Roster requirements per platform; one FLEX slot takes any FLEX_POSITIONS player
+    ROSTERS = {
+        'DraftKings': {
+            'salary_cap': 50000,
+            'positions': {'QB': 1, 'RB': 2, 'WR': 3, 'TE': 1, 'DST': 1},
+            'flex': 1
+        },
+        'FanDuel': {
+            'salary_cap': 60000,
+            'positions': {'QB': 1, 'RB': 2, 'WR': 3, 'TE': 1, 'D': 1},
+            'flex': 1
+        }
+    }
+    FLEX_POSITIONS = ('RB', 'WR', 'TE')
+    
+    # Runner-up lineups kept to warm-start the next solve
+    RUNNER_UPS = 50
+    
+    def __init__(self,
+                 finder: BlockFinder,
+                 platform: str = 'DraftKings',
+                 projections: Optional[Dict[str, float]] = None,
+                 window: int = 8):
+        """
+        Args:
+            finder: BlockFinder whose slate and stats the lineups come from
+            platform: Key of ROSTERS ('DraftKings' or 'FanDuel')
+            projections: Optional {player name: projected points}; players
+                not listed use the mean of their recent games
+            window: Recent weeks averaged for the default projections
+        """
+        if platform not in self.ROSTERS:
+            raise ValueError(f"platform must be one of {list(self.ROSTERS)}, got {platform!r}")
+        
+        self.finder = finder
+        self.roster = self.ROSTERS[platform]
+        self.salary_cap = self.roster['salary_cap']
+        
+        # Player pool: one row per player ID
+        pool = finder.dk_data.drop_duplicates('player_id')
+        pool = pool[pool['Salary'] > 0]
+        ids = pool['player_id'].to_numpy()
+        mean, _ = finder.player_distributions(ids, min(window, len(finder.weeks)))
+        if projections:
+            overrides = dict(zip(finder.player_ids(list(projections)), projections.values()))
+            mean = np.array([overrides.get(i, m) for i, m in zip(ids, mean)])
+        self.pool = pool.assign(projection=mean).set_index('player_id')
+        
+        # Salaries in units of their common divisor keep the tables small
+        self.unit = int(np.gcd.reduce(self.pool['Salary'].astype(int).to_numpy())) or 1
+        self.budget = self.salary_cap // self.unit
+        
+        # Positions the slate has players for
+        self.positions = {
+            position: count for position, count in self.roster['positions'].items()
+            if (self.pool['Position'] == position).any()
+        }
+        for position in set(self.roster['positions']) - set(self.positions):
+            print(f"⚠️  No {position} players on the slate: building lineups without that slot")
+        
+        self.roster_size = sum(self.positions.values()) + self.roster['flex']
+    
+    def build(self,
+              blocks: Optional[BlockTable] = None,
+              n_lineups: int = 1,
+              max_exposure: float = 1.0,
+              max_block_exposure: Optional[float] = None,
+              min_unique: int = 1) -> pd.DataFrame:
+        """
+        Generate lineups, best first
+        
+        Args:
+            blocks: Blocks to anchor lineups on (default: finder.blocks)
+            n_lineups: Number of lineups to generate
+            max_exposure: Max share of lineups any one player may appear in
+            max_block_exposure: Max share of lineups per block (default:
+                same as max_exposure)
+            min_unique: Players each lineup must not share with every
+                earlier lineup
+        
+        Returns:
+            DataFrame with one row per lineup: Lineup, Block, one column per
+            roster slot, Salary and Projection (fewer rows than n_lineups if
+            the constraints leave no more valid lineups)
+        """
+        blocks = self.finder.blocks if blocks is None else blocks
+        if max_block_exposure is None:
+            max_block_exposure = max_exposure
+        player_limit = max(1, int(max_exposure * n_lineups))
+        block_limit = max(1, int(max_block_exposure * n_lineups))
+        
+        print(f"🧩 Building {n_lineups} lineups from {len(blocks)} blocks "
+              f"(cap ${self.salary_cap:,})...")
+        
+        search = _LineupSearch(self, blocks, min_unique)
+        player_counts: Dict[int, int] = {}
+        block_counts: Dict[int, int] = {}
+        lineups = []
+        
+        for _ in range(n_lineups):
+            solution = search.solve()
+            if solution is None:
+                print(f"⚠️  Only {len(lineups)} lineups satisfy the constraints")
+                break
+            
+            value, block, players = solution
+            lineups.append(solution)
+            search.add_lineup(players)
+            
+            # Exposure limits shrink the pool for later lineups
+            block_counts[block] = block_counts.get(block, 0) + 1
+            if block_counts[block] >= block_limit:
+                search.exclude_block(block)
+            for player in players:
+                player_counts[player] = player_counts.get(player, 0) + 1
+                if player_counts[player] >= player_limit:
+                    search.exclude_player(player)
+        
+        print(f"✅ Built {len(lineups)} lineups")
+        
+        return self._lineup_frame(blocks, lineups)
+    
+    def _lineup_frame(self, blocks: BlockTable, lineups: List[Tuple]) -> pd.DataFrame:
+        """One row per lineup, players placed in roster slots"""
+        # QB, RB1, RB2, WR1, ..., TE, FLEX, DST: FLEX goes after the FLEX positions
+        position_slots = {
+            position: [position] if count == 1 else [f"{position}{k + 1}" for k in range(count)]
+            for position, count in self.positions.items()
+        }
+        slots = []
+        for position, names in position_slots.items():
+            if position not in self.FLEX_POSITIONS and 'FLEX' not in slots and slots:
+                slots += ['FLEX'] * self.roster['flex']
+            slots += names
+        if 'FLEX' not in slots:
+            slots += ['FLEX'] * self.roster['flex']
+        
+        rows = []
+        for number, (value, block, players) in enumerate(lineups, start=1):
+            chosen = self.pool.loc[list(players)].sort_values('Salary', ascending=False, kind='stable')
+            row = {'Lineup': number, 'Block': blocks[block]['name']}
+            open_slots = {position: list(names) for position, names in position_slots.items()}
+            for name, position in zip(chosen['Name'], chosen['Position']):
+                slot = open_slots[position].pop(0) if open_slots[position] else 'FLEX'
+                row[slot] = name
+            row['Salary'] = int(chosen['Salary'].sum())
+            row['Projection'] = round(value, 2)
+            rows.append(row)
+        
+        return pd.DataFrame(rows, columns=['Lineup', 'Block'] + slots + ['Salary', 'Projection'])
+
+class _LineupSearch:
+    """Branch-and-bound state shared by the lineups of one build() call"""
+    
+    # Candidates sorted per step of the best-bound-first loop
+    BATCH = 256
+    
+    def __init__(self, builder: LineupBuilder, blocks: BlockTable, min_unique: int):
+        self.builder = builder
+        self.pool = builder.pool
+        self.budget = builder.budget
+        self.unit = builder.unit
+        self.overlap_limit = builder.roster_size - min_unique
+        
+        # Count requirements per FLEX choice, e.g. RB 3 / WR 3 / TE 1
+        base = builder.positions
+        self.groups = list(base)
+        self.configs = []
+        for position in builder.FLEX_POSITIONS:
+            if position in base:
+                config = dict(base)
+                config[position] += builder.roster['flex']
+                self.configs.append(config)
+        self.max_counts = {
+            position: max(config[position] for config in self.configs) for position in self.groups
+        }
+        
+        self.excluded_players = set()
+        self.previous = np.zeros((0, 0), dtype=np.int8)  # player x earlier lineup membership
+        self.player_rows = {player: row for row, player in enumerate(self.pool.index)}
+        self.runner_ups: List[Tuple[float, int, Tuple[int, ...]]] = []
+        
+        # _convolution[s, t] = s - t, or the -inf pad slot where t > s
+        budgets = np.arange(self.budget + 1)
+        shift = budgets[:, None] - budgets[None, :]
+        self._convolution = np.where(shift >= 0, shift, self.budget + 1)
+        
+        self._tables: Dict[str, Tuple] = {}
+        self._suffixes: Dict[Tuple[int, ...], List[np.ndarray]] = {}
+        for position in self.groups:
+            self._build_group(position)
+        
+        # Blocks: players, salary, projection and players per position
+        block_ids = blocks.player_ids
+        rows = self.pool.index.get_indexer(block_ids.ravel()).reshape(block_ids.shape)
+        group_codes = pd.Index(self.groups).get_indexer(self.pool['Position'])
+        self.block_players = [tuple(ids) for ids in block_ids.tolist()]
+        self.block_value = self.pool['projection'].to_numpy()[rows].sum(axis=1)
+        self.block_salary = (self.pool['Salary'].to_numpy()[rows].sum(axis=1) // self.unit).astype(int)
+        block_groups = group_codes[rows]
+        counts = (block_groups[:, :, None] == np.arange(len(self.groups))).sum(axis=1)
+        self.count_keys, self.count_codes = np.unique(counts.reshape(len(rows), -1), axis=0, return_inverse=True)
+        self.count_members = [np.flatnonzero(self.count_codes.ravel() == code) for code in range(len(self.count_keys))]
+        self.block_ids = block_ids
+        
+        # Blocks with a player off the roster (e.g. a K) can't be used
+        self.block_open = ~(block_groups < 0).any(axis=1)
+    
+    # Constraint updates between lineups
+    
+    def add_lineup(self, players: Tuple[int, ...]):
+        column = np.zeros((len(self.player_rows), 1), dtype=np.int8)
+        column[[self.player_rows[player] for player in players]] = 1
+        self.previous = np.hstack([self.previous.reshape(len(self.player_rows), -1), column])
+    
+    def exclude_block(self, block: int):
+        self.block_open[block] = False
+    
+    def exclude_player(self, player: int):
+        self.excluded_players.add(player)
+        position = self.pool.at[player, 'Position']
+        if position in self._tables:
+            # Only the table rows up to the player's own include them, and
+            # only suffixes that take players of the position use the table
+            ids = self._tables[position][0]
+            self._fill_rows(position, int(np.flatnonzero(ids == player)[0]))
+            group = self.groups.index(position)
+            self._suffixes = {
+                counts: suffix for counts, suffix in self._suffixes.items() if not counts[group]
+            }
+        self.block_open &= ~(self.block_ids == player).any(axis=1)
+    
+    # Bound tables
+    
+    def _build_group(self, position: str):
+        """
+        Knapsack table for one position: table[i, j, s] is the best
+        projection from j players among the group's players i.. with total
+        salary at most s units (-inf if impossible); excluded players count
+        as absent
+        """
+        group = self.pool[self.pool['Position'] == position]
+        group = group.sort_values('projection', ascending=False, kind='stable')
+        ids = group.index.to_numpy()
+        salaries = (group['Salary'].to_numpy() // self.unit).astype(int)
+        values = group['projection'].to_numpy(dtype=float)
+        k = self.max_counts[position]
+        
+        table = np.full((len(ids) + 1, k + 1, self.budget + 1), -np.inf)
+        table[len(ids), 0, :] = 0.0
+        self._tables[position] = (ids, salaries, values, table)
+        self._fill_rows(position, len(ids) - 1)
+    
+    def _fill_rows(self, position: str, last: int):
+        """Recompute table rows last..0 of a position (rows after last are kept)"""
+        ids, salaries, values, table = self._tables[position]
+        for i in range(last, -1, -1):
+            table[i] = table[i + 1]
+            cost = salaries[i]
+            if cost <= self.budget and ids[i] not in self.excluded_players:
+                table[i, 1:, cost:] = np.maximum(
+                    table[i, 1:, cost:], values[i] + table[i + 1, :-1, :self.budget + 1 - cost]
+                )
+    
+    def _suffix(self, counts: Tuple[int, ...]) -> List[np.ndarray]:
+        """
+        suffix[g][s]: best projection filling counts[g:] of groups g.. within
+        s salary units (max-plus convolution of the group tables)
+        """
+        if counts not in self._suffixes:
+            suffix = [np.zeros(self.budget + 1)]
+            for position, count in reversed(list(zip(self.groups, counts))):
+                group = self._tables[position][3][0, count]
+                # combined[s] = max over t <= s of group[t] + later[s - t]
+                later = np.append(suffix[0], -np.inf)
+                suffix.insert(0, (group[None, :] + later[self._convolution]).max(axis=1))
+            self._suffixes[counts] = suffix
+        return self._suffixes[counts]
+    
+    # Search
+    
+    def solve(self) -> Optional[Tuple[float, int, Tuple[int, ...]]]:
+        """Best (value, block, players) satisfying the current constraints, or None"""
+        best = self._warm_start()
+        self._best = best
+        
+        # Upper bound of every (block, FLEX choice) pair, grouped by the
+        # block's players per position so each group is one array operation
+        remaining = self.budget - self.block_salary
+        usable = self.block_open & (remaining >= 0)
+        bounds, members, needs = [], [], []
+        for counts, blocks in zip(self.count_keys, self.count_members):
+            blocks = blocks[usable[blocks]]
+            if not len(blocks):
+                continue
+            for config in self.configs:
+                need = tuple(int(config[g] - c) for g, c in zip(self.groups, counts))
+                if min(need) < 0:
+                    continue
+                bound = self.block_value[blocks] + self._suffix(need)[0][remaining[blocks]]
+                keep = np.isfinite(bound)
+                if best is not None:
+                    keep &= bound > best[0] + 1e-9
+                bounds.append(bound[keep])
+                members.append(blocks[keep])
+                needs.extend([need] * int(keep.sum()))
+        
+        if bounds:
+            bounds = np.concatenate(bounds)
+            members = np.concatenate(members)
+            
+            # Search candidates best bound first, sorting one batch at a time
+            pending = np.arange(len(bounds))
+            while len(pending):
+                if len(pending) > self.BATCH:
+                    top = np.argpartition(-bounds[pending], self.BATCH)[:self.BATCH]
+                    batch = pending[top[np.argsort(-bounds[pending[top]], kind='stable')]]
+                    pending = np.delete(pending, top)
+                else:
+                    batch = pending[np.argsort(-bounds[pending], kind='stable')]
+                    pending = pending[:0]
+                
+                for k in batch:
+                    if self._best is not None and bounds[k] <= self._best[0] + 1e-9:
+                        return self._best
+                    self._search_block(int(members[k]), needs[k])
+        
+        return self._best
+    
+    def _warm_start(self) -> Optional[Tuple[float, int, Tuple[int, ...]]]:
+        """Best runner-up from earlier solves that is still valid"""
+        valid = [
+            candidate for candidate in self.runner_ups
+            if self.block_open[candidate[1]]
+            and not self.excluded_players.intersection(candidate[2])
+            and self._overlap_ok(candidate[2])
+        ]
+        self.runner_ups = valid
+        return max(valid, key=lambda candidate: candidate[0]) if valid else None
+    
+    def _overlap_ok(self, players) -> bool:
+        if not self.previous.size:
+            return True
+        rows = [self.player_rows[player] for player in players]
+        return self.previous[rows].sum(axis=0).max() <= self.overlap_limit
+    
+    def _search_block(self, block: int, need: Tuple[int, ...]):
+        fixed = self.block_players[block]
+        budget = self.budget - self.block_salary[block]
+        overlap = self.previous[[self.player_rows[p] for p in fixed]].sum(axis=0) \
+            if self.previous.size else np.zeros(0)
+        suffix = self._suffix(need)
+        blocked = set(fixed) | self.excluded_players
+        
+        def visit(g: int, i: int, j: int, budget: int, value: float, chosen: list, overlap: np.ndarray):
+            while j == 0:
+                g += 1
+                if g == len(self.groups):
+                    self._record(value, block, tuple(fixed) + tuple(chosen))
+                    return
+                i, j = 0, need[g]
+            
+            ids, salaries, values, table = self._tables[self.groups[g]]
+            if len(ids) - i < j:
+                return
+            
+            # Best completion: j more from this group plus all later groups
+            # (-inf: nothing fits, pruned even before there is an incumbent)
+            bound = value + (table[i, j, :budget + 1] + suffix[g + 1][budget::-1]).max()
+            if bound == -np.inf or self._best is not None and bound <= self._best[0] + 1e-9:
+                return
+            
+            player = ids[i]
+            if salaries[i] <= budget and player not in blocked:
+                taken = overlap + self.previous[self.player_rows[player]] if overlap.size else overlap
+                if not taken.size or taken.max() <= self.overlap_limit:
+                    chosen.append(player)
+                    visit(g, i + 1, j - 1, budget - salaries[i], value + values[i], chosen, taken)
+                    chosen.pop()
+            visit(g, i + 1, j, budget, value, chosen, overlap)
+        
+        if not overlap.size or overlap.max() <= self.overlap_limit:
+            visit(-1, 0, 0, budget, float(self.block_value[block]), [], overlap)
+    
+    def _record(self, value: float, block: int, players: Tuple[int, ...]):
+        if self._best is not None and value <= self._best[0] + 1e-9:
+            return
+        if self._best is not None and all(self._best[2] != c[2] for c in self.runner_ups):
+            self.runner_ups.append(self._best)
+            self.runner_ups = sorted(self.runner_ups, key=lambda c: -c[0])[:LineupBuilder.RUNNER_UPS]
+        self._best = (value, block, players)
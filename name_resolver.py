@@ -0,0 +1,227 @@
+"""
+Name Resolver
+Matches salary-file names to nfl_data_py stat names that differ in spelling
+"""
+
+import json
+import os
+import re
+from collections import Counter, defaultdict
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+class NameResolver:
+    """
+    Resolve slate players whose player_key has no exact match in the stats
+    
+    Unmatched slate players are looked up, in order, in:
+      1. the persisted alias map (exact lookup, built up by earlier runs)
+      2. a loose key with suffixes and punctuation removed
+         ("Marvin Harrison Jr." -> "marvin harrison"), same position and
+         team
+      3. a character trigram index over the unmatched stats players,
+         blocked by team and position, then by position alone for
+         players who changed teams
+    
+    A match on another team (a player who changed teams) is only taken
+    when no other stats player shares the loose key, so "Brian Thomas Jr."
+    never resolves to a different Brian Thomas elsewhere.
+    
+    Only stats players that match no slate player are candidates, and each
+    is used at most once, so a resolution never steals an exact match.
+    """
+    
+    # Name suffixes nfl_data_py and the DFS sites disagree on
+    SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+    
+    # File name BlockFinder saves the alias map under inside a SlateCache directory
+    ALIAS_FILE = 'name_aliases.json'
+    
+    # DFS site abbreviation -> nfl_data_py abbreviation
+    TEAM_ALIASES = {'JAC': 'JAX', 'LAR': 'LA', 'WSH': 'WAS', 'OAK': 'LV', 'SD': 'LAC', 'STL': 'LA'}
+    
+    def __init__(self, alias_file: Optional[str] = None, min_score: float = 0.6):
+        """
+        Args:
+            alias_file: JSON file the alias map is loaded from and saved to
+                (None keeps aliases in memory only)
+            min_score: Minimum trigram similarity (Dice, 0-1) for a fuzzy match
+        """
+        self.alias_file = alias_file
+        self.min_score = min_score
+        self.aliases: Dict[str, str] = {}
+        self.last_report: Optional[Dict] = None
+        
+        if alias_file and os.path.exists(alias_file):
+            with open(alias_file) as f:
+                self.aliases = json.load(f)
+    
+    @classmethod
+    def loose_key(cls, key: str) -> str:
+        """player_key without punctuation or name suffixes"""
+        tokens = re.sub(r"[^a-z0-9 ]", "", key.replace('-', ' ')).split()
+        while len(tokens) > 2 and tokens[-1] in cls.SUFFIXES:
+            tokens.pop()
+        return ' '.join(tokens)
+    
+    @staticmethod
+    def _trigrams(text: str) -> set:
+        padded = f"  {text} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+    
+    def resolve(self, dk_data: pd.DataFrame, stats_data: pd.DataFrame) -> Dict[str, str]:
+        """
+        Match unmatched slate players to stats players
+        
+        Args:
+            dk_data: Slate with player_key, Team and Position columns
+            stats_data: Stats with player_key and, when available,
+                recent_team and position columns
+        
+        Returns:
+            {stats player_key: slate player_key} for every resolved player
+        """
+        slate_keys = set(dk_data['player_key'])
+        stats_keys = set(stats_data['player_key'])
+        
+        slate = self._players(dk_data, 'Team', 'Position')
+        unmatched = [player for player in slate if player[0] not in stats_keys]
+        free = [player for player in self._players(stats_data, 'recent_team', 'position')
+                if player[0] not in slate_keys]
+        free_keys = {key for key, _, _ in free}
+        
+        mapping: Dict[str, str] = {}
+        counts = Counter()
+        
+        # 1. Aliases saved by earlier runs
+        pending = []
+        for player in unmatched:
+            alias = self.aliases.get(player[0])
+            if alias in free_keys and alias not in mapping:
+                mapping[alias] = player[0]
+                counts['alias'] += 1
+            else:
+                pending.append(player)
+        
+        # 2. Loose keys, then 3. the trigram index
+        loose = defaultdict(list)
+        for player in free:
+            loose[self.loose_key(player[0])].append(player)
+        # Loose keys several stats players share (only same-team matches count)
+        shared = Counter(self.loose_key(key) for key in stats_keys)
+        shared = {key for key, count in shared.items() if count > 1}
+        index = _TrigramIndex(free, self.loose_key, shared)
+        
+        for key, team, position in pending:
+            loose_key = self.loose_key(key)
+            match = self._loose_match(loose.get(loose_key, []), team, position, mapping, loose_key not in shared)
+            kind = 'loose'
+            if match is None:
+                match = index.best_match(loose_key, team, position, self.min_score, mapping)
+                kind = 'fuzzy'
+            if match is not None:
+                mapping[match] = key
+                self.aliases[key] = match
+                counts[kind] += 1
+        
+        if self.alias_file and (counts['loose'] or counts['fuzzy']):
+            with open(self.alias_file, 'w') as f:
+                json.dump(self.aliases, f, indent=2, sort_keys=True)
+        
+        total = len(slate_keys)
+        exact = total - len({key for key, _, _ in unmatched})
+        matched = exact + len(mapping)
+        self.last_report = {
+            'slate_players': total,
+            'matched': matched,
+            'exact': exact,
+            'alias': counts['alias'],
+            'resolved': counts['loose'] + counts['fuzzy'],
+            'unmatched': sorted(set(key for key, _, _ in unmatched) - set(mapping.values())),
+        }
+        rate = matched / total if total else 1.0
+        print(f"🔗 Matched {matched}/{total} slate players to stats ({rate:.0%}): "
+              f"{exact} exact, {counts['alias']} saved aliases, "
+              f"{counts['loose'] + counts['fuzzy']} newly resolved")
+        
+        return mapping
+    
+    @classmethod
+    def _players(cls, frame: pd.DataFrame, team_column: str, position_column: str) -> List[Tuple[str, str, str]]:
+        """Unique (player_key, team, position) triples, teams in nfl_data_py abbreviations"""
+        columns = {'player_key': frame['player_key']}
+        for name, column in (('team', team_column), ('position', position_column)):
+            columns[name] = frame[column].astype(str) if column in frame.columns else ''
+        players = pd.DataFrame(columns).drop_duplicates()
+        players['team'] = players['team'].replace(cls.TEAM_ALIASES)
+        return list(players.itertuples(index=False, name=None))
+    
+    @staticmethod
+    def _loose_match(candidates: List[Tuple[str, str, str]],
+                     team: str,
+                     position: str,
+                     taken: Dict[str, str],
+                     unique: bool) -> Optional[str]:
+        """
+        The one free candidate with this loose key and position: on the same
+        team, or on any team when the loose key is unique in the stats
+        (positions missing from either file match any position)
+        """
+        candidates = [
+            (key, candidate_team) for key, candidate_team, candidate_position in candidates
+            if key not in taken and (not position or not candidate_position or candidate_position == position)
+        ]
+        keys = {key for key, candidate_team in candidates if candidate_team == team}
+        if not keys and unique:
+            keys = {key for key, _ in candidates}
+        return keys.pop() if len(keys) == 1 else None
+
+class _TrigramIndex:
+    """
+    Trigram postings over free stats players, blocked by (team, position)
+    and position; players whose loose key is shared are only in the first
+    """
+    
+    def __init__(self, players: List[Tuple[str, str, str]], loose_key, shared: set):
+        self.keys = [key for key, _, _ in players]
+        self.grams = [NameResolver._trigrams(loose_key(key)) for key in self.keys]
+        self.postings = defaultdict(lambda: defaultdict(list))
+        for i, (key, team, position) in enumerate(players):
+            blocks = [(team, position)] if loose_key(key) in shared else [(team, position), (position,)]
+            for block in blocks:
+                for gram in self.grams[i]:
+                    self.postings[block][gram].append(i)
+    
+    def best_match(self,
+                   name: str,
+                   team: str,
+                   position: str,
+                   min_score: float,
+                   taken: Dict[str, str]) -> Optional[str]:
+        """Best free key scoring at least min_score, or None if missing or tied"""
+        grams = NameResolver._trigrams(name)
+        for block in ((team, position), (position,)):
+            postings = self.postings.get(block)
+            if not postings:
+                continue
+            
+            shared = Counter()
+            for gram in grams:
+                shared.update(postings.get(gram, ()))
+            
+            # Best score per stats player (a traded player sits in two teams)
+            best = {}
+            for i, count in shared.items():
+                key = self.keys[i]
+                if key not in taken:
+                    score = 2 * count / (len(grams) + len(self.grams[i]))
+                    best[key] = max(score, best.get(key, 0.0))
+            
+            scored = sorted(((score, key) for key, score in best.items() if score >= min_score), reverse=True)
+            if not scored:
+                continue
+            if len(scored) > 1 and scored[1][0] == scored[0][0]:
+                return None  # Ambiguous in this block
+            return scored[0][1]
+        
+        return None
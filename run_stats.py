@@ -0,0 +1,164 @@
+"""
+Run Stats
+Opt-in per-phase timing, call counts and peak memory for BlockFinder runs
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+import pandas as pd
+from typing import Callable, Dict, Optional
+
+class RunStats:
+    """
+    Where one BlockFinder run (construction, find_blocks, ...) spent its time
+    
+    Each phase records its call count, total wall time and, with
+    track_memory, the peak traced memory above the level at phase start
+    (tracemalloc, which NumPy reports its arrays to). Counters track the
+    candidate blocks examined, rejected and accepted.
+    
+    Phases run by process-pool workers are merged in when their shard
+    returns, so with workers > 1 phase seconds add up CPU time across
+    processes and can exceed wall_seconds.
+    
+    A disabled RunStats (enabled=False) makes phase() and count() no-ops,
+    which is what BlockFinder uses when instrumentation is off.
+    """
+    
+    # Phases in pipeline order (to_frame lists these first)
+    PHASES = (
+        'merge', 'eligibility', 'enumeration', 'salary_filter', 'pruning',
+        'game_logs', 'correlation', 'metrics', 'sorting'
+    )
+    
+    # Candidate counters (pruned_* are dropped before game logs are assembled)
+    COUNTERS = (
+        'candidates_examined', 'rejected_salary', 'pruned_ceiling', 'pruned_correlation',
+        'rejected_min_weeks', 'rejected_ceiling', 'accepted'
+    )
+    
+    def __init__(self,
+                 name: str = 'run',
+                 enabled: bool = True,
+                 track_memory: bool = False,
+                 hook: Optional[Callable[[str, float, 'RunStats'], None]] = None):
+        """
+        Args:
+            name: What ran (e.g. 'find_blocks')
+            enabled: Record anything at all
+            track_memory: Also record peak memory per phase (tracemalloc
+                slows allocation-heavy phases down)
+            hook: Called as hook(phase, seconds, stats) each time a phase ends
+        """
+        self.name = name
+        self.enabled = enabled
+        self.track_memory = track_memory and enabled
+        self.hook = hook
+        self.phases: Dict[str, Dict] = {}
+        self.counters: Dict[str, int] = dict.fromkeys(self.COUNTERS, 0)
+        self.wall_seconds: Optional[float] = None
+        self._started = time.perf_counter()
+        self._memory_stack = []
+        self._owns_tracing = False
+        
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracing = True
+    
+    def phase(self, name: str):
+        """Context manager that times (and counts) one call of a phase"""
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name)
+    
+    @contextmanager
+    def _timed(self, name: str):
+        if self.track_memory:
+            self._enter_memory()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak_mb = self._exit_memory() if self.track_memory else None
+            self._record(name, 1, seconds, peak_mb)
+            if self.hook is not None:
+                self.hook(name, seconds, self)
+    
+    def _enter_memory(self):
+        # An outer phase keeps the peak reached so far before the reset
+        current, peak = tracemalloc.get_traced_memory()
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        self._memory_stack.append([current, current])
+    
+    def _exit_memory(self) -> float:
+        start, earlier_peak = self._memory_stack.pop()
+        peak = max(tracemalloc.get_traced_memory()[1], earlier_peak)
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+        return (peak - start) / 1024 ** 2
+    
+    def _record(self, name: str, calls: int, seconds: float, peak_mb: Optional[float]):
+        entry = self.phases.setdefault(name, {'calls': 0, 'seconds': 0.0, 'peak_mb': None})
+        entry['calls'] += calls
+        entry['seconds'] += seconds
+        if peak_mb is not None:
+            entry['peak_mb'] = max(entry['peak_mb'] or 0.0, peak_mb)
+    
+    def count(self, name: str, n: int):
+        """Add n to a counter"""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + int(n)
+    
+    def merge(self, other: Dict):
+        """Add the phases and counters of another run's to_dict() (e.g. a worker's)"""
+        if not self.enabled:
+            return
+        for name, entry in other['phases'].items():
+            self._record(name, entry['calls'], entry['seconds'], entry['peak_mb'])
+            if self.hook is not None:
+                self.hook(name, entry['seconds'], self)
+        for name, n in other['counters'].items():
+            self.count(name, n)
+    
+    def finish(self):
+        """Stop the clock (and tracemalloc, if this run started it)"""
+        if self.wall_seconds is None:
+            self.wall_seconds = time.perf_counter() - self._started
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+    
+    def to_dict(self) -> Dict:
+        """Plain-dict copy (picklable, JSON-serializable)"""
+        return {
+            'name': self.name,
+            'wall_seconds': self.wall_seconds,
+            'phases': {name: dict(entry) for name, entry in self.phases.items()},
+            'counters': dict(self.counters),
+        }
+    
+    def to_frame(self) -> pd.DataFrame:
+        """One row per recorded phase: calls, seconds, share of wall time, peak_mb"""
+        order = [name for name in self.PHASES if name in self.phases]
+        order += [name for name in self.phases if name not in self.PHASES]
+        wall = self.wall_seconds or sum(entry['seconds'] for entry in self.phases.values())
+        return pd.DataFrame({
+            'phase': order,
+            'calls': [self.phases[name]['calls'] for name in order],
+            'seconds': [self.phases[name]['seconds'] for name in order],
+            'share': [self.phases[name]['seconds'] / wall if wall else 0.0 for name in order],
+            'peak_mb': [self.phases[name]['peak_mb'] for name in order],
+        })
+    
+    def __repr__(self) -> str:
+        wall = 'running' if self.wall_seconds is None else f"{self.wall_seconds:.3f}s"
+        lines = [f"RunStats({self.name}, {wall})"]
+        for row in self.to_frame().itertuples(index=False):
+            memory = '' if pd.isna(row.peak_mb) else f", peak {row.peak_mb:.1f} MB"
+            lines.append(f"  {row.phase:<14}{row.seconds:>9.4f}s {row.share:>5.0%}  x{row.calls}{memory}")
+        lines.append('  ' + ', '.join(f"{name} {n:,}" for name, n in self.counters.items()))
+        return '\n'.join(lines)
@@ -0,0 +1,90 @@
+"""
+Search Job
+Runs a block search on a background thread with live progress and cancellation
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+from block_finder import BlockTable, SearchCancelled
+
+class SearchJob:
+    """
+    One block search running on a daemon thread
+    
+    The target is called as target(progress=..., cancel=...) and should
+    pass both on to BlockFinder.find_blocks. Progress updates and the best
+    blocks found so far are kept on the job, so a UI can poll them (e.g.
+    the Streamlit app reruns a fragment every half second) without ever
+    touching the search thread.
+    
+    Example:
+        job = SearchJob(lambda **hooks: finder.find_blocks(10200, **hooks))
+        ...
+        job.progress, job.partial_results(), job.cancel()
+    """
+    
+    def __init__(self, target: Callable[..., BlockTable], keep_top: int = 25):
+        """
+        Args:
+            target: Runs the search, accepting progress and cancel keywords
+            keep_top: Best blocks (by ceiling) kept as partial results
+        """
+        self.keep_top = keep_top
+        self.progress: Dict = {'done': 0, 'total': 0, 'unit': '', 'candidates': 0, 'blocks': 0}
+        self.result: Optional[BlockTable] = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self._top: Optional[BlockTable] = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, args=(target,), daemon=True)
+        self._thread.start()
+    
+    @property
+    def running(self) -> bool:
+        return self.finished is None
+    
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.time()) - self.started
+    
+    def cancel(self):
+        """Ask the search to stop after the team/window it is working on"""
+        self._cancel.set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the search ends (True) or timeout passes (False)"""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+    
+    def partial_results(self) -> Optional[BlockTable]:
+        """Best blocks found so far, by ceiling (None before the first shard)"""
+        with self._lock:
+            return self._top
+    
+    def _run(self, target: Callable[..., BlockTable]):
+        try:
+            self.result = target(progress=self._on_progress, cancel=self._cancel)
+        except SearchCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = time.time()
+    
+    def _on_progress(self, update: Dict):
+        table = update['table']
+        
+        # Merge this shard's best blocks into the running top list
+        if len(table) > self.keep_top:
+            table = table.sort_by('ceiling')[:self.keep_top]
+        with self._lock:
+            if self._top is not None:
+                table = BlockTable.concat(
+                    [self._top, table], table.slate, table.combos.shape[1], table.game_logs.shape[1]
+                )
+            self._top = table.sort_by('ceiling')[:self.keep_top]
+            self.progress = {key: value for key, value in update.items() if key != 'table'}
@@ -0,0 +1,162 @@
+"""
+Slate Cache
+On-disk cache of the merged slate, score matrix and correlation matrices
+"""
+
+import hashlib
+import os
+import shutil
+import time
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional
+
+# Bump when the layout or meaning of a cache entry changes
+# (3: score matrix weeks are season * 100 + week when stats have seasons)
+CACHE_VERSION = 3
+
+class SlateCache:
+    """
+    Content-addressed cache of everything BlockFinder derives from its inputs
+    
+    Each entry is a directory named by a hash of the salary and stats
+    columns the engine reads. Arrays are stored as .npy and opened with
+    mmap_mode='r', so a warm start maps the files instead of parsing CSVs
+    or rebuilding the matrices. Correlation matrices are stored per
+    analysis window as they are computed.
+    
+    Entries are evicted oldest-used first once the directory grows past
+    max_bytes.
+    """
+    
+    # Input columns that feed the cached data (player_key carries name
+    # resolution; columns missing from a frame are left out of its hash)
+    DK_COLUMNS = ['Name', 'Position', 'Salary', 'Team', 'Opponent']
+    STATS_COLUMNS = ['player_name', 'player_key', 'season', 'week', 'fantasy_points_ppr']
+    
+    def __init__(self, cache_dir: str = '.block_cache', max_bytes: int = 1024 ** 3):
+        """
+        Args:
+            cache_dir: Directory holding one subdirectory per cache entry
+            max_bytes: Total size the cache may grow to before eviction
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    @classmethod
+    def content_key(cls, dk_data: pd.DataFrame, stats_data: pd.DataFrame) -> str:
+        """Hash of the salary and stats inputs (row order matters, the index does not)"""
+        digest = hashlib.sha1(f"v{CACHE_VERSION}".encode())
+        for frame, columns in ((dk_data, cls.DK_COLUMNS), (stats_data, cls.STATS_COLUMNS)):
+            present = [column for column in columns if column in frame.columns]
+            digest.update(','.join(present).encode())
+            digest.update(pd.util.hash_pandas_object(frame[present], index=False).to_numpy().tobytes())
+        return digest.hexdigest()[:24]
+    
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+    
+    def load_slate(self, key: str) -> Optional[Dict]:
+        """
+        Load a cached slate
+        
+        Returns:
+            Dict with enriched_data, weeks, score_matrix and played_mask
+            (arrays memory-mapped), or None on a miss
+        """
+        path = self._entry_dir(key)
+        try:
+            slate = {
+                'enriched_data': pd.read_pickle(os.path.join(path, 'enriched_data.pkl')),
+                'weeks': np.load(os.path.join(path, 'weeks.npy')),
+                'score_matrix': np.load(os.path.join(path, 'score_matrix.npy'), mmap_mode='r'),
+                'played_mask': np.load(os.path.join(path, 'played_mask.npy'), mmap_mode='r'),
+            }
+        except (OSError, ValueError, EOFError):
+            return None
+        
+        self._touch(path)
+        return slate
+    
+    def save_slate(self,
+                   key: str,
+                   enriched_data: pd.DataFrame,
+                   weeks: np.ndarray,
+                   score_matrix: np.ndarray,
+                   played_mask: np.ndarray):
+        """Write a slate entry, then evict old entries if over budget"""
+        path = self._entry_dir(key)
+        
+        # Write to a temp dir and rename, so readers never see half an entry
+        staging = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(staging, exist_ok=True)
+        try:
+            enriched_data.to_pickle(os.path.join(staging, 'enriched_data.pkl'))
+            np.save(os.path.join(staging, 'weeks.npy'), np.asarray(weeks))
+            np.save(os.path.join(staging, 'score_matrix.npy'), score_matrix)
+            np.save(os.path.join(staging, 'played_mask.npy'), played_mask)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            os.replace(staging, path)
+        except OSError as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            print(f"⚠️  Could not write slate cache: {e}")
+            return
+        
+        self.evict()
+    
+    def load_correlation(self, key: str, window: int) -> Optional[np.ndarray]:
+        """Memory-mapped correlation matrix for one window, or None on a miss"""
+        path = os.path.join(self._entry_dir(key), f"correlation_{window}.npy")
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+    
+    def save_correlation(self, key: str, window: int, matrix: np.ndarray):
+        """Add a correlation matrix to an existing slate entry"""
+        path = self._entry_dir(key)
+        if not os.path.isdir(path):
+            return
+        
+        target = os.path.join(path, f"correlation_{window}.npy")
+        staging = f"{target}.{os.getpid()}.tmp.npy"
+        try:
+            np.save(staging, matrix)
+            os.replace(staging, target)
+        except OSError as e:
+            print(f"⚠️  Could not write correlation cache: {e}")
+            return
+        
+        self._touch(path)
+        self.evict()
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isdir(path) and not name.endswith('.tmp'):
+                entries.append((os.path.getmtime(path), self._size(path), path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+    
+    def clear(self):
+        """Remove every cache entry"""
+        for name in os.listdir(self.cache_dir):
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+    
+    @staticmethod
+    def _size(path: str) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+    
+    @staticmethod
+    def _touch(path: str):
+        now = time.time()
+        os.utime(path, (now, now))
@@ -0,0 +1,185 @@
+"""
+BlockFinder tests
+Late-swap deltas, stud comparisons, simulations, run stats and the command line
+"""
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from block_finder import BlockFinder, main
+from fetch_data import build_sample_data
+
+@pytest.fixture
+def finder():
+    dk_data, _, stats_data = build_sample_data()
+    finder = BlockFinder(dk_data, stats_data)
+    finder.find_blocks(10200, same_team_only=False)
+    return finder
+
+def test_removed_stud_is_off_the_slate(finder):
+    stud = 'Christian McCaffrey'
+    block = finder.blocks[0]
+    assert finder.compare_to_stud(block, stud) is not None
+    
+    finder.apply_delta(removed=[stud])
+    
+    assert finder.player_ids([stud]) == [None]
+    assert finder.compare_to_stud(block, stud) is None
+    report = finder.simulate(studs=[stud, 'Josh Allen'], n_sims=1000, seed=0)
+    assert report.studs['stud_name'].tolist() == ['Josh Allen']
+    
+    # Added back, the player keeps their old ID and stats
+    [player_id] = finder.player_ids(['Josh Allen'])
+    finder.apply_delta(added=build_sample_data()[0].query('Name == @stud'))
+    assert finder.player_ids([stud]) != [None]
+    assert finder.compare_to_stud(block, stud)['stud_price'] == 10200
+    assert finder.player_ids(['Josh Allen']) == [player_id]
+
+def block_rows(table):
+    """Blocks of a table as comparable rows, whatever the player order"""
+    frame = table.to_frame()
+    frame['Block'] = [tuple(sorted(block.split(' + '))) for block in frame['Block']]
+    return sorted(frame.itertuples(index=False, name=None))
+
+@pytest.mark.parametrize('same_team_only, block_size', [(True, 2), (True, 3), (False, 2), (False, 3)])
+def test_apply_delta_matches_fresh_search(same_team_only, block_size):
+    dk_data, _, stats_data = build_sample_data(48, n_teams=4, seed=3, seasons=[2024], weeks=range(1, 11))
+    players = dk_data[dk_data['Position'].isin(['QB', 'WR', 'TE'])]['Name'].tolist()
+    removed, repriced, added = players[:2], {players[2]: 7400, players[3]: 3100}, players[4:6]
+    search = dict(target_price=5000 * block_size, tolerance=1000,
+                  same_team_only=same_team_only, block_size=block_size)
+    
+    finder = BlockFinder(dk_data[~dk_data['Name'].isin(added)].copy(), stats_data.copy())
+    finder.find_blocks(**search)
+    finder.apply_delta(
+        added=dk_data[dk_data['Name'].isin(added)], removed=removed, repriced=repriced
+    )
+    
+    # The same slate loaded from scratch
+    slate = dk_data[~dk_data['Name'].isin(added + removed)].copy()
+    slate['Salary'] = [repriced.get(name, salary) for name, salary in zip(slate['Name'], slate['Salary'])]
+    slate = pd.concat([slate, dk_data[dk_data['Name'].isin(added)]], ignore_index=True)
+    fresh = BlockFinder(slate, stats_data.copy()).find_blocks(**search)
+    
+    assert len(fresh) > 0
+    assert block_rows(finder.blocks) == block_rows(fresh)
+
+@pytest.mark.parametrize('same_team_only', [True, False])
+def test_stud_report_matches_compare_to_stud(same_team_only):
+    dk_data, _, stats_data = build_sample_data(48, n_teams=4, seed=3, seasons=[2024], weeks=range(1, 11))
+    finder = BlockFinder(dk_data, stats_data)
+    report = finder.stud_report(7000, tolerance=500, same_team_only=same_team_only)
+    rows = report.to_frame()
+    assert len(report.studs) > 1 and len(rows) > 0
+    
+    # One find_blocks + compare_to_stud round per stud
+    expected = []
+    for stud, price in zip(report.studs['stud_name'], report.studs['stud_price']):
+        blocks = finder.find_blocks(price, tolerance=500, same_team_only=same_team_only)
+        expected += [finder.compare_to_stud(block, stud) for block in blocks]
+    expected = pd.DataFrame(expected)
+    
+    columns = ['block_name', 'stud_name', 'block_price', 'stud_price', 'ceiling_diff', 'avg_diff']
+    order = ['stud_name', 'block_name']
+    pd.testing.assert_frame_equal(
+        rows[columns].sort_values(order, ignore_index=True),
+        expected[columns].sort_values(order, ignore_index=True),
+        check_dtype=False
+    )
+
+def test_simulate_matches_sorted_draws(finder):
+    studs = ['Christian McCaffrey', 'Josh Allen']
+    report = finder.simulate(studs=studs, n_sims=5000, seed=7)
+    blocks = finder.blocks
+    
+    # The same draws, summarized by sorting every block's totals
+    stud_ids = finder.player_ids(studs)
+    players = np.unique(np.concatenate([blocks.player_ids.ravel(), stud_ids]))
+    window = min(2 * blocks.game_logs.shape[1], len(finder.weeks))
+    draws = finder._draw_outcomes(players, window, 5000, np.random.default_rng(7))
+    totals = draws[np.searchsorted(players, blocks.player_ids)].sum(axis=1)
+    ordered = np.sort(totals, axis=1)
+    
+    np.testing.assert_array_equal(report.blocks['sim_mean'], totals.mean(axis=1, dtype=float).round(1))
+    np.testing.assert_array_equal(report.blocks['sim_p90'], ordered[:, 4499].astype(float).round(1))
+    np.testing.assert_array_equal(report.blocks['sim_p99'], ordered[:, 4949].astype(float).round(1))
+    stud_totals = draws[np.searchsorted(players, stud_ids)]
+    np.testing.assert_array_equal(
+        report.beat_probability, (totals[:, None, :] > stud_totals[None]).mean(axis=2)
+    )
+
+@pytest.fixture
+def instrumented():
+    dk_data, _, stats_data = build_sample_data(48, n_teams=4, seed=3, seasons=[2024], weeks=range(1, 11))
+    return BlockFinder(dk_data, stats_data, instrument=True)
+
+@pytest.mark.parametrize('target_price, search', [
+    (10000, dict(same_team_only=True)),
+    (15000, dict(same_team_only=False, block_size=3, min_ceiling=60, min_correlation=0.2)),
+    (15000, dict(same_team_only=False, block_size=3, workers=2)),
+    (20000, dict(same_game_only=True, block_size=4, tolerance=2000)),
+])
+def test_run_stats_account_for_every_candidate(instrumented, target_price, search):
+    phases = []
+    instrumented.profile_hook = lambda phase, seconds, stats: phases.append(phase)
+    blocks = instrumented.find_blocks(target_price, **search)
+    stats = instrumented.last_run_stats
+    counters = stats.counters
+    
+    assert stats.name == 'find_blocks' and stats.wall_seconds is not None
+    assert counters['accepted'] == len(blocks) > 0
+    rejected = [name for name in stats.COUNTERS if name not in ('candidates_examined', 'accepted')]
+    assert counters['candidates_examined'] == counters['accepted'] + sum(counters[name] for name in rejected)
+    assert {'enumeration', 'game_logs', 'metrics', 'sorting'} <= set(stats.phases) <= set(stats.PHASES)
+    assert set(phases) == set(stats.phases)
+    assert list(stats.to_frame()['phase']) == [name for name in stats.PHASES if name in stats.phases]
+
+def test_iter_blocks_finishes_when_stopped_early(instrumented):
+    instrumented.track_memory = True
+    search = dict(target_price=15000, same_team_only=False, block_size=3)
+    names = {block['name'] for block in instrumented.iter_blocks(**search)}
+    assert names == set(instrumented.find_blocks(**search).to_frame()['Block'])
+    
+    blocks = instrumented.iter_blocks(**search)
+    first = [next(blocks) for _ in range(3)]
+    stats = instrumented.last_run_stats
+    assert stats.name == 'iter_blocks' and stats.wall_seconds is None
+    
+    blocks.close()
+    assert len(first) == 3
+    assert stats.wall_seconds is not None
+    assert not tracemalloc.is_tracing()
+
+@pytest.fixture
+def slate_files(tmp_path):
+    dk_data, _, stats_data = build_sample_data(48, n_teams=4, seed=3, seasons=[2024], weeks=range(1, 11))
+    dk_data.to_csv(tmp_path / 'salaries.csv', index=False)
+    stats_data.to_csv(tmp_path / 'stats.csv', index=False)
+    return str(tmp_path / 'salaries.csv'), str(tmp_path / 'stats.csv')
+
+def test_command_line_targets(slate_files, tmp_path):
+    output = tmp_path / 'blocks.csv'
+    main([*slate_files, '--targets', '9800', '10200', '--cross-team', '--weeks', '5',
+          '--output', str(output)])
+    
+    results = pd.read_csv(output)
+    finder = BlockFinder(*(pd.read_csv(path) for path in slate_files))
+    for target in (9800, 10200):
+        expected = finder.find_blocks(target, min_weeks=5, same_team_only=False).to_frame()
+        rows = results[results['Target'] == target].drop(columns='Target').reset_index(drop=True)
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(rows, expected, check_dtype=False)
+    assert results.columns[0] == 'Target'
+
+def test_command_line_stud_report(slate_files, tmp_path):
+    output = tmp_path / 'studs.jsonl'
+    main([*slate_files, '--all-studs', '7000', '--tolerance', '500', '--output', str(output)])
+    
+    results = pd.read_json(output, lines=True)
+    finder = BlockFinder(*(pd.read_csv(path) for path in slate_files))
+    expected = finder.stud_report(7000, tolerance=500).to_frame()
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(results, expected, check_dtype=False)
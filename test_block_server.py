@@ -0,0 +1,105 @@
+"""
+Block server tests
+Query responses against the engine, the response cache and the HTTP round trip
+"""
+
+import threading
+
+import pandas as pd
+import pytest
+
+from block_finder import BlockFinder
+from block_server import BlockClient, BlockService, QueryError, make_server
+from fetch_data import build_sample_data
+
+@pytest.fixture(scope='module')
+def slate_files(tmp_path_factory):
+    path = tmp_path_factory.mktemp('slate')
+    dk_data, _, stats_data = build_sample_data(48, n_teams=4, seed=3, seasons=[2024], weeks=range(1, 11))
+    dk_data.to_csv(path / 'salaries.csv', index=False)
+    stats_data.to_csv(path / 'stats.csv', index=False)
+    return str(path / 'salaries.csv'), str(path / 'stats.csv')
+
+@pytest.fixture(scope='module')
+def finder(slate_files):
+    return BlockFinder(*(pd.read_csv(path) for path in slate_files))
+
+@pytest.fixture
+def service(slate_files):
+    service = BlockService(cache_size=8)
+    service.add_slate('dk', *slate_files)
+    return service
+
+def test_find_blocks_matches_engine_and_is_cached(service, finder, slate_files):
+    params = {'target_price': 10200, 'same_team_only': False, 'limit': 5}
+    response, cached = service.query('find_blocks', params)
+    
+    expected = finder.find_blocks(10200, same_team_only=False)
+    assert not cached
+    assert response['slate'] == 'dk'
+    assert response['count'] == len(expected) > 5
+    assert [block['name'] for block in response['blocks']] == [block['name'] for block in expected][:5]
+    assert [block['ceiling'] for block in response['blocks']] == list(expected['ceiling'][:5])
+    
+    repeat, cached = service.query('find_blocks', params)
+    assert cached and repeat is response
+    
+    # Reloading the slate drops its cached responses
+    service.add_slate('dk', *slate_files)
+    assert not service.query('find_blocks', params)[1]
+
+def test_compare_to_stud_matches_engine(service, finder):
+    stud = finder.dk_data.sort_values('Salary')['Name'].iloc[-1]
+    response, _ = service.query('compare_to_stud', {'stud': stud, 'tolerance': 500, 'limit': 1000})
+    
+    price = int(finder.dk_data.loc[finder.dk_data['Name'] == stud, 'Salary'].iloc[0])
+    blocks = finder.find_blocks(price, tolerance=500)
+    expected = pd.DataFrame([finder.compare_to_stud(block, stud) for block in blocks])
+    rows = pd.DataFrame(response['comparisons'])
+    assert response['count'] == len(blocks) == len(rows) > 0
+    assert (rows['ceiling_diff'].diff().dropna() <= 0).all()
+    
+    columns = ['block_name', 'block_price', 'stud_price', 'ceiling_diff', 'avg_diff']
+    pd.testing.assert_frame_equal(
+        rows[columns].sort_values('block_name', ignore_index=True),
+        expected[columns].sort_values('block_name', ignore_index=True),
+        check_dtype=False
+    )
+
+@pytest.mark.parametrize('endpoint, params, status', [
+    ('compare_to_stud', {'stud': 'Nobody Atall'}, 404),
+    ('compare_to_stud', {}, 400),
+    ('find_blocks', {'target_price': 10000, 'slate': 'fd'}, 404),
+    ('find_blocks', {'tolerance': 500}, 400),
+    ('find_blocks', {'target_price': 10000, 'limit': -1}, 400),
+    ('find_blocks', {'target_price': 10000, 'colour': 'red'}, 400),
+    ('lineups', {}, 404),
+])
+def test_bad_queries(service, endpoint, params, status):
+    with pytest.raises(QueryError) as error:
+        service.query(endpoint, params)
+    assert error.value.status == status
+
+def test_http_round_trip(service):
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = BlockClient(f"http://127.0.0.1:{server.server_address[1]}", timeout=60)
+        expected, _ = service.query('find_blocks', {'target_price': 10200, 'limit': 3})
+        
+        response = client.find_blocks(10200, limit=3)
+        assert response['cached']
+        assert response['count'] == expected['count']
+        assert [block['name'] for block in response['blocks']] == [block['name'] for block in expected['blocks']]
+        
+        health = client.health()
+        assert health['status'] == 'ok'
+        assert health['slates']['dk']['players'] == len(service.finders['dk'].dk_data)
+        
+        timings = client.timings()['endpoints']['find_blocks']
+        assert timings['requests'] == 1 and timings['cache_hits'] == 1 and timings['errors'] == 0
+        assert timings['p50_ms'] is not None
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,232 @@
+"""
+Brute-force regression tests
+Checks the block enumeration paths and LineupBuilder against exhaustive
+searches on the sample slates (run with: python -m pytest -q)
+"""
+
+from itertools import combinations, product
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from block_finder import BlockFinder
+from fetch_data import build_sample_data
+from lineup_builder import LineupBuilder
+
+@pytest.fixture(scope='module', params=['sample', 'synthetic'])
+def slate(request):
+    """(dk_data, stats_data): the hand-picked sample slate and a larger synthetic one"""
+    if request.param == 'sample':
+        dk_data, _, stats_data = build_sample_data()
+    else:
+        dk_data, _, stats_data = build_sample_data(48, n_teams=4, seed=3, seasons=[2024], weeks=range(1, 11))
+    return dk_data, stats_data
+
+@pytest.fixture(scope='module')
+def finder(slate):
+    return BlockFinder(*slate)
+
+def brute_force_blocks(dk_data: pd.DataFrame,
+                       stats_data: pd.DataFrame,
+                       target_price: int,
+                       tolerance: int,
+                       min_weeks: int,
+                       positions,
+                       block_size: int,
+                       group: str):
+    """
+    {frozenset of names: metrics} for every qualifying block, one
+    combination at a time straight from the raw stats
+    """
+    stats_data = stats_data[stats_data['player_name'].isin(dk_data['Name'])]
+    week_keys = stats_data['season'] * 100 + stats_data['week']
+    weeks = sorted(week_keys.unique(), reverse=True)
+    scores = {
+        (name, key): points for name, key, points in
+        zip(stats_data['player_name'], week_keys, stats_data['fantasy_points_ppr'])
+    }
+    
+    def correlation(a, b):
+        shared = [week for week in weeks[:min_weeks] if (a, week) in scores and (b, week) in scores]
+        if len(shared) < 3:
+            return 0.5
+        x = np.array([scores[a, week] for week in shared])
+        y = np.array([scores[b, week] for week in shared])
+        if x.std() == 0 or y.std() == 0:
+            return 0.0
+        return float(np.clip(np.corrcoef(x, y)[0, 1], 0.0, 1.0))
+    
+    eligible = dk_data[dk_data['Position'].isin(positions) & (dk_data['Salary'] > 0)]
+    players = list(eligible.itertuples(index=False))
+    blocks = {}
+    
+    for combo in combinations(players, block_size):
+        if group == 'team' and len({p.Team for p in combo}) > 1:
+            continue
+        if group == 'game' and len({frozenset((p.Team, p.Opponent)) for p in combo}) > 1:
+            continue
+        price = sum(p.Salary for p in combo)
+        if abs(price - target_price) > tolerance:
+            continue
+        
+        names = [p.Name for p in combo]
+        recent = [week for week in weeks[:min_weeks * 2]
+                  if all((name, week) in scores for name in names)]
+        if len(recent) < min_weeks:
+            continue
+        game_log = np.array([sum(scores[name, week] for name in names) for week in recent[:min_weeks]])
+        
+        blocks[frozenset(names)] = {
+            'Price': price,
+            'Avg_Score': round(game_log.mean(), 1),
+            'Ceiling': round(game_log.max(), 1),
+            'Floor': round(game_log.min(), 1),
+            'games_30plus': int((game_log >= 30).sum()),
+            'Correlation': round(np.mean([correlation(a, b) for a, b in combinations(names, 2)]), 2),
+            'Value_per_1K': round(game_log.mean() / (price / 1000), 2)
+        }
+    
+    return blocks
+
+def assert_blocks_match(table, expected):
+    """Same blocks as the brute force, with the same metrics"""
+    frame = table.to_frame()
+    found = {frozenset(block.split(' + ')): row for block, row in zip(frame['Block'], frame.to_dict('records'))}
+    assert len(found) == len(frame), "duplicate blocks"
+    assert set(found) == set(expected)
+    
+    for key, row in found.items():
+        want = expected[key]
+        assert row['Price'] == want['Price']
+        assert int(row['30+_Games'].split('/')[0]) == want['games_30plus']
+        # Metrics may differ by one rounding step (float32 scores, summed correlations)
+        for column, step in [('Avg_Score', 0.1), ('Ceiling', 0.1), ('Floor', 0.1),
+                             ('Correlation', 0.01), ('Value_per_1K', 0.01)]:
+            assert row[column] == pytest.approx(want[column], abs=step + 1e-9), (key, column)
+    
+    ceilings = frame['Ceiling'].to_numpy()
+    assert (ceilings[:-1] >= ceilings[1:]).all()
+
+@pytest.mark.parametrize('block_size, group, workers', [
+    (2, 'team', 1),     # combination array per team
+    (3, 'team', 1),
+    (2, 'cross', 1),    # salary windows
+    (3, 'cross', 1),
+    (3, 'cross', 2),    # salary windows split across processes
+    (4, 'game', 1),     # meet in the middle per game
+    (4, 'game', 2),
+])
+def test_find_blocks_matches_brute_force(slate, finder, block_size, group, workers):
+    dk_data, stats_data = slate
+    positions = ['QB', 'RB', 'WR', 'TE']
+    # A price every slate has blocks near
+    target = int(dk_data['Salary'].median() * block_size)
+    tolerance = 1500 if block_size < 4 else 3000
+    
+    table = finder.find_blocks(
+        target, tolerance=tolerance, min_weeks=4, positions=positions,
+        block_size=block_size, same_team_only=(group == 'team'),
+        same_game_only=(group == 'game'), workers=workers
+    )
+    expected = brute_force_blocks(
+        dk_data, stats_data, target, tolerance, 4, positions, block_size, group
+    )
+    
+    assert_blocks_match(table, expected)
+
+def test_top_k_and_limits_match_full_search(finder):
+    full = finder.find_blocks(15000, tolerance=2000, same_team_only=False, block_size=3)
+    frame = full.to_frame()
+    
+    top = finder.find_blocks(15000, tolerance=2000, same_team_only=False, block_size=3, top_k=5)
+    assert top.to_frame()['Ceiling'].tolist() == frame['Ceiling'].head(5).tolist()
+    
+    limited = finder.find_blocks(15000, tolerance=2000, same_team_only=False, block_size=3,
+                                 min_ceiling=40, min_correlation=0.3)
+    kept = frame[(frame['Ceiling'] >= 40) & (frame['Correlation'] >= 0.3)]
+    assert sorted(limited.to_frame()['Block']) == sorted(kept['Block'])
+
+@pytest.mark.parametrize('block_size', [2, 3, 4, 5])
+@pytest.mark.parametrize('first_players', [None, (0, 7), (7, 20)])
+def test_salary_window_combinations(block_size, first_players):
+    rng = np.random.default_rng(block_size)
+    salaries = rng.integers(30, 100, size=20) * 100
+    low, high = 5000 * block_size / 2 - 800, 5000 * block_size / 2 + 800
+    
+    combos = BlockFinder._salary_window_combinations(salaries, block_size, low, high, first_players)
+    
+    # first_players limits the cheapest player of each combination (in salary order)
+    rank = np.empty(len(salaries), dtype=int)
+    rank[np.argsort(salaries, kind='stable')] = np.arange(len(salaries))
+    expected = {
+        combo for combo in combinations(range(len(salaries)), block_size)
+        if low <= salaries[list(combo)].sum() <= high
+        and (first_players is None or first_players[0] <= rank[list(combo)].min() < first_players[1])
+    }
+    found = {tuple(sorted(combo)) for combo in combos.tolist()}
+    assert len(found) == len(combos)
+    assert found == expected
+
+@pytest.mark.parametrize('block_size', [4, 5])
+def test_meet_in_middle_combinations(block_size):
+    rng = np.random.default_rng(block_size)
+    salaries = rng.integers(30, 100, size=18) * 100
+    low, high = 6000 * block_size - 1000, 6000 * block_size + 1000
+    
+    combos = BlockFinder._meet_in_middle_combinations(salaries, block_size, low, high)
+    
+    expected = {
+        combo for combo in combinations(range(len(salaries)), block_size)
+        if low <= salaries[list(combo)].sum() <= high
+    }
+    found = {tuple(sorted(combo)) for combo in combos.tolist()}
+    assert len(found) == len(combos)
+    assert found == expected
+
+@pytest.fixture(scope='module')
+def lineup_slate():
+    """One team of a synthetic slate: 20 players, small enough to enumerate every lineup"""
+    dk_data, _, stats_data = build_sample_data(40, n_teams=2, seed=1)
+    dk_data = dk_data[dk_data['Team'] == dk_data['Team'].iloc[0]].reset_index(drop=True)
+    finder = BlockFinder(dk_data, stats_data)
+    blocks = finder.find_blocks(12000, tolerance=1500, min_weeks=4, same_team_only=True)
+    return finder, blocks
+
+def brute_force_lineups(builder: LineupBuilder, blocks) -> np.ndarray:
+    """Projection of every distinct valid lineup that contains a block, best first"""
+    pool = builder.pool
+    by_position = {position: pool.index[pool['Position'] == position].tolist()
+                   for position in builder.positions}
+    
+    lineups = []
+    for flex in builder.FLEX_POSITIONS:
+        if flex not in by_position:
+            continue
+        counts = dict(builder.positions)
+        counts[flex] += builder.roster['flex']
+        choices = [combinations(by_position[position], count) for position, count in counts.items()]
+        lineups += [sum(parts, ()) for parts in product(*map(list, choices))]
+    lineups = np.array(lineups)
+    
+    salaries = pool.loc[lineups.ravel(), 'Salary'].to_numpy().reshape(lineups.shape).sum(axis=1)
+    values = pool.loc[lineups.ravel(), 'projection'].to_numpy().reshape(lineups.shape).sum(axis=1)
+    
+    has_block = np.zeros(len(lineups), dtype=bool)
+    for row in range(len(blocks)):
+        has_block |= np.all([(lineups == player).any(axis=1) for player in blocks[row]['player_ids']], axis=0)
+    
+    return np.sort(values[has_block & (salaries <= builder.salary_cap)])[::-1]
+
+def test_lineup_builder_matches_brute_force(lineup_slate):
+    finder, blocks = lineup_slate
+    assert len(blocks) > 0
+    builder = LineupBuilder(finder)
+    expected = brute_force_lineups(builder, blocks)
+    
+    lineups = builder.build(blocks, n_lineups=3)
+    
+    # With no binding exposure limits the lineups are the three best distinct ones
+    assert lineups['Projection'].tolist() == pytest.approx(np.round(expected[:3], 2).tolist(), abs=1e-6)
+    assert (lineups['Salary'] <= builder.salary_cap).all()
+    assert lineups['Block'].isin(blocks.to_frame()['Block']).all()
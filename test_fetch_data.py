@@ -0,0 +1,31 @@
+"""
+fetch_data tests
+Compact multi-season stats loading
+"""
+
+import numpy as np
+import pandas as pd
+
+from block_finder import BlockFinder
+from fetch_data import STATS_COLUMNS, STATS_DTYPES, build_sample_data, load_nfl_stats
+
+def test_load_nfl_stats_keeps_compact_dtypes(tmp_path):
+    dk_data, _, stats_data = build_sample_data(120, n_teams=4, seasons=[2022, 2023, 2024], seed=5)
+    csv_path = tmp_path / 'stats.csv'
+    stats_data.to_csv(csv_path, index=False)
+    
+    stats = load_nfl_stats([2023, 2024], weeks=(3, 14), positions=['QB', 'WR', 'TE'], csv_path=str(csv_path))
+    
+    assert stats.dtypes.astype(str).to_dict() == STATS_DTYPES
+    expected = stats_data[
+        stats_data['season'].isin([2023, 2024]) & stats_data['week'].between(3, 14)
+        & stats_data['position'].isin(['QB', 'WR', 'TE'])
+    ][STATS_COLUMNS].reset_index(drop=True)
+    pd.testing.assert_frame_equal(stats.astype(expected.dtypes.to_dict()), expected, check_exact=False, atol=1e-4)
+    
+    # The engine sees the same scores as with the full-precision stats
+    compact = BlockFinder(dk_data.copy(), stats)
+    full = BlockFinder(dk_data.copy(), expected.copy())
+    np.testing.assert_array_equal(compact.weeks, full.weeks)
+    np.testing.assert_array_equal(compact.score_matrix, full.score_matrix)
+    np.testing.assert_array_equal(compact.played_mask, full.played_mask)
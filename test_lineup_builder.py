@@ -0,0 +1,65 @@
+"""
+LineupBuilder tests
+Exposure limits on a full-size slate and the incremental bound tables
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from block_finder import BlockFinder
+from fetch_data import build_sample_data
+from lineup_builder import LineupBuilder, _LineupSearch
+
+@pytest.fixture(scope='module')
+def large_slate():
+    """1,000 players on 32 teams and the same-team blocks near a stud's price"""
+    dk_data, _, stats_data = build_sample_data(1000, n_teams=32, seed=42)
+    finder = BlockFinder(dk_data, stats_data)
+    return finder, finder.find_blocks(10200)
+
+def test_excluded_players_match_rebuilt_tables(large_slate):
+    finder, blocks = large_slate
+    search = _LineupSearch(LineupBuilder(finder), blocks, min_unique=1)
+    search._suffix((1, 2, 3, 1))
+    
+    pool = search.pool
+    for position in ['QB', 'WR', 'TE']:
+        # The best players of the position and one from the middle
+        ids = search._tables[position][0]
+        for player in [ids[0], ids[1], ids[len(ids) // 2]]:
+            search.exclude_player(player)
+    cached = {position: search._tables[position][3].copy() for position in search.groups}
+    suffix = search._suffix((1, 2, 3, 1))
+    
+    for position in search.groups:
+        search._build_group(position)
+        assert np.array_equal(search._tables[position][3], cached[position]), position
+    search._suffixes.clear()
+    for kept, rebuilt in zip(suffix, search._suffix((1, 2, 3, 1))):
+        assert np.array_equal(kept, rebuilt)
+    assert pool.index.isin(search.excluded_players).sum() == 9
+
+@pytest.mark.parametrize('max_exposure, min_unique', [(1.0, 1), (0.3, 1), (0.3, 2)])
+def test_exposure_limits_take_seconds(large_slate, max_exposure, min_unique):
+    finder, blocks = large_slate
+    builder = LineupBuilder(finder)
+    
+    start = time.perf_counter()
+    lineups = builder.build(blocks, n_lineups=150, max_exposure=max_exposure, min_unique=min_unique)
+    elapsed = time.perf_counter() - start
+    
+    assert len(lineups) == 150
+    assert elapsed < 30, f"150 lineups took {elapsed:.1f}s"
+    
+    slots = [column for column in lineups.columns if column not in ('Lineup', 'Block', 'Salary', 'Projection')]
+    players = lineups[slots].to_numpy()
+    _, exposure = np.unique(players, return_counts=True)
+    assert exposure.max() <= max(1, int(max_exposure * 150))
+    assert (lineups['Salary'] <= builder.salary_cap).all()
+    assert (np.diff(lineups['Projection']) <= 1e-9).all()
+    
+    # Every pair of lineups differs in at least min_unique players
+    sets = [set(row) for row in players.tolist()]
+    assert all(len(a - b) >= min_unique for k, a in enumerate(sets) for b in sets[:k])
@@ -0,0 +1,65 @@
+"""
+NameResolver tests
+Loose and fuzzy matches, team/position checks and the persisted alias map
+"""
+
+import json
+
+import pandas as pd
+
+from name_resolver import NameResolver
+
+def frames(slate, stats):
+    """Salary and stats frames from (name, team, position) triples, keyed like BlockFinder"""
+    def key(names):
+        return names.str.lower().str.replace('.', '').str.strip()
+    
+    dk_data = pd.DataFrame(slate, columns=['Name', 'Team', 'Position'])
+    dk_data['player_key'] = key(dk_data['Name'])
+    stats_data = pd.DataFrame(stats, columns=['player_name', 'recent_team', 'position'])
+    stats_data['player_key'] = key(stats_data['player_name'])
+    return dk_data, stats_data
+
+def test_suffixes_and_spelling_resolve():
+    dk_data, stats_data = frames(
+        [('Marvin Harrison Jr.', 'ARI', 'WR'), ('Joshua Palmer', 'LAC', 'WR'),
+         ('Travis Etienne', 'JAC', 'RB'), ('Patrick Mahomes', 'KC', 'QB')],
+        [('Marvin Harrison', 'ARI', 'WR'), ('Josh Palmer', 'LAC', 'WR'),
+         ('Travis Etienne Jr.', 'JAX', 'RB'), ('Patrick Mahomes', 'KC', 'QB')]
+    )
+    
+    mapping = NameResolver().resolve(dk_data, stats_data)
+    
+    assert mapping == {
+        'marvin harrison': 'marvin harrison jr',
+        'josh palmer': 'joshua palmer',
+        'travis etienne jr': 'travis etienne',
+    }
+
+def test_other_team_needs_a_unique_name_and_the_same_position():
+    dk_data, stats_data = frames(
+        [('Brian Thomas Jr.', 'JAX', 'WR'), ('Brian Thomas Sr.', 'CHI', 'RB'),
+         ('Mike Williams Jr.', 'PIT', 'WR'), ('Calvin Ridley', 'TEN', 'WR')],
+        [('Brian Thomas', 'NO', 'WR'), ('Brian Thomas Sr.', 'CHI', 'RB'),
+         ('Mike Williams', 'NYJ', 'TE'), ('Calvin Ridley Jr.', 'JAX', 'WR')]
+    )
+    
+    resolver = NameResolver()
+    mapping = resolver.resolve(dk_data, stats_data)
+    
+    # Calvin Ridley changed teams, and no other stats player has his name
+    assert mapping == {'calvin ridley jr': 'calvin ridley'}
+    assert resolver.last_report['unmatched'] == ['brian thomas jr', 'mike williams jr']
+
+def test_aliases_persist(tmp_path):
+    alias_file = tmp_path / NameResolver.ALIAS_FILE
+    dk_data, stats_data = frames(
+        [('Marvin Harrison Jr.', 'ARI', 'WR')], [('Marvin Harrison', 'ARI', 'WR')]
+    )
+    
+    NameResolver(str(alias_file)).resolve(dk_data, stats_data)
+    assert json.loads(alias_file.read_text()) == {'marvin harrison jr': 'marvin harrison'}
+    
+    resolver = NameResolver(str(alias_file))
+    assert resolver.resolve(dk_data, stats_data) == {'marvin harrison': 'marvin harrison jr'}
+    assert resolver.last_report['alias'] == 1 and resolver.last_report['resolved'] == 0
@@ -0,0 +1,49 @@
+"""
+SearchJob tests
+Background searches with progress, partial results, cancellation and errors
+"""
+
+import pytest
+
+from block_finder import BlockFinder
+from fetch_data import build_sample_data
+from search_job import SearchJob
+
+@pytest.fixture(scope='module')
+def finder():
+    dk_data, _, stats_data = build_sample_data(120, n_teams=4, seed=3, seasons=[2024], weeks=range(1, 11))
+    return BlockFinder(dk_data, stats_data)
+
+def test_finished_job_keeps_results_and_progress(finder):
+    search = dict(target_price=15000, tolerance=1000, same_team_only=False, block_size=3)
+    job = SearchJob(lambda **hooks: finder.find_blocks(**search, **hooks), keep_top=10)
+    assert job.wait(60)
+    
+    expected = finder.find_blocks(**search)
+    assert not job.running and not job.cancelled and job.error is None
+    assert job.result.to_frame().equals(expected.to_frame())
+    assert job.progress['done'] == job.progress['total'] > 1
+    assert job.progress['blocks'] == len(expected)
+    assert list(job.partial_results()['ceiling']) == list(expected['ceiling'][:10])
+
+def test_cancel_stops_after_the_current_shard(finder):
+    def search(progress, cancel):
+        def cancel_after_first(update):
+            progress(update)
+            cancel.set()
+        return finder.find_blocks(10000, progress=cancel_after_first, cancel=cancel)
+    
+    job = SearchJob(search)
+    assert job.wait(60)
+    
+    assert job.cancelled and job.result is None and job.error is None
+    assert job.progress['done'] == 1 < job.progress['total']
+    assert job.partial_results() is not None
+
+def test_errors_are_kept_on_the_job():
+    def search(**hooks):
+        raise ValueError("bad search")
+    
+    job = SearchJob(search)
+    assert job.wait(60)
+    assert isinstance(job.error, ValueError) and not job.cancelled and job.result is None
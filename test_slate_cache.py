@@ -0,0 +1,68 @@
+"""
+SlateCache tests
+Warm starts reproduce the cold arrays; changed inputs and eviction miss
+"""
+
+import numpy as np
+import pandas as pd
+
+from block_finder import BlockFinder
+from fetch_data import build_sample_data
+from slate_cache import SlateCache
+
+def sample_slate():
+    dk_data, _, stats_data = build_sample_data(48, n_teams=4, seed=3)
+    return dk_data, stats_data
+
+def test_warm_start_gives_identical_arrays(tmp_path, capsys):
+    cache = SlateCache(str(tmp_path))
+    cold = BlockFinder(*sample_slate(), cache=cache)
+    cold_blocks = cold.find_blocks(10000, tolerance=1000, same_team_only=False)
+    assert 'Loaded slate from cache' not in capsys.readouterr().out
+    
+    warm = BlockFinder(*sample_slate(), cache=cache)
+    assert 'Loaded slate from cache' in capsys.readouterr().out
+    
+    np.testing.assert_array_equal(warm.weeks, cold.weeks)
+    np.testing.assert_array_equal(warm.score_matrix, cold.score_matrix)
+    np.testing.assert_array_equal(warm.played_mask, cold.played_mask)
+    pd.testing.assert_frame_equal(warm.enriched_data, cold.enriched_data)
+    
+    # The correlation matrix comes from disk, not the cold finder's memory
+    assert cache.load_correlation(warm._cache_key, 4) is not None
+    np.testing.assert_array_equal(warm.correlation_matrix(4), cold.correlation_matrix(4))
+    warm_blocks = warm.find_blocks(10000, tolerance=1000, same_team_only=False)
+    pd.testing.assert_frame_equal(warm_blocks.to_frame(), cold_blocks.to_frame())
+
+def test_changed_inputs_miss(tmp_path, capsys):
+    cache = SlateCache(str(tmp_path))
+    dk_data, stats_data = sample_slate()
+    key = BlockFinder(dk_data, stats_data, cache=cache)._cache_key
+    
+    repriced = dk_data.copy()
+    repriced.loc[0, 'Salary'] += 100
+    rescored = stats_data.copy()
+    rescored.loc[0, 'fantasy_points_ppr'] += 1.0
+    capsys.readouterr()
+    
+    for dk_changed, stats_changed in [(repriced, stats_data), (dk_data, rescored)]:
+        finder = BlockFinder(dk_changed.copy(), stats_changed.copy(), cache=cache)
+        assert finder._cache_key != key
+        assert 'Loaded slate from cache' not in capsys.readouterr().out
+    
+    # Row labels don't matter, row contents do
+    relabeled = dk_data.set_axis(dk_data.index + 1000)
+    assert SlateCache.content_key(relabeled, stats_data) == key
+
+def test_eviction_keeps_newest_entries(tmp_path):
+    cache = SlateCache(str(tmp_path))
+    dk_data, stats_data = sample_slate()
+    first = BlockFinder(dk_data.copy(), stats_data.copy(), cache=cache)._cache_key
+    
+    # Room for one entry: the second slate evicts the first
+    cache.max_bytes = int(cache._size(str(tmp_path / first)) * 1.5)
+    repriced = dk_data.assign(Salary=dk_data['Salary'] + 100)
+    second = BlockFinder(repriced, stats_data.copy(), cache=cache)._cache_key
+    
+    assert cache.load_slate(first) is None
+    assert cache.load_slate(second) is not None